@@ -0,0 +1,201 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, HERE)
+sys.path.insert(0, ROOT)
+
+from fake_tmdb import FakeTMDb
+
+
+def percentile(sorted_samples, q):
+    if not sorted_samples:
+        return 0.0
+    idx = min(len(sorted_samples) - 1, max(0, round(q / 100 * len(sorted_samples) + 0.5) - 1))
+    return sorted_samples[idx]
+
+
+def summarize(samples, items_per_sample=1):
+    ordered = sorted(samples)
+    total = sum(ordered)
+    return {
+        'count': len(ordered),
+        'mean_ms': total / len(ordered) * 1000 if ordered else 0.0,
+        'p50_ms': percentile(ordered, 50) * 1000,
+        'p95_ms': percentile(ordered, 95) * 1000,
+        'p99_ms': percentile(ordered, 99) * 1000,
+        'throughput_per_s': items_per_sample * len(ordered) / total if total else 0.0,
+    }
+
+
+def load_app_module(fake, cache_dir, pages):
+    os.environ.update({
+        'TMDB_API_KEY': 'benchmark',
+        'TMDB_API_BASE': fake.url + '/3',
+        'TMDB_IMAGE_BASE': fake.url + '/t/p',
+        'TMDB_CACHE_DIR': cache_dir,
+        'TMDB_PAGE_COUNT': str(pages),
+    })
+    os.environ.setdefault('KIVY_NO_ARGS', '1')
+    os.environ.setdefault('KIVY_NO_FILELOG', '1')
+    os.environ.setdefault('KIVY_GL_BACKEND', 'mock')
+    os.environ.setdefault('SDL_VIDEODRIVER', 'offscreen')
+    import main
+    return main
+
+
+def tick_until(clock, done, timeout):
+    deadline = time.perf_counter() + timeout
+    while not done():
+        if time.perf_counter() > deadline:
+            raise TimeoutError('grid did not fill in time')
+        clock.tick()
+
+
+def bench_parse(main, fake, iterations):
+    body = json.dumps(fake.page('popular', 1))
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        results = json.loads(body)['results']
+        [main.MovieDetails.from_dict(m) for m in results]
+        samples.append(time.perf_counter() - t0)
+    return summarize(samples, len(results))
+
+
+def bench_fetch(main, iterations, pages):
+    cold, warm = [], []
+    for _ in range(iterations):
+        main.response_cache.clear()
+        for p in range(1, pages + 1):
+            t0 = time.perf_counter()
+            main.fetch_movies('popular', page_number=p)
+            cold.append(time.perf_counter() - t0)
+        for p in range(1, pages + 1):
+            t0 = time.perf_counter()
+            main.fetch_movies('popular', page_number=p)
+            warm.append(time.perf_counter() - t0)
+    return summarize(cold), summarize(warm)
+
+
+def bench_cards(main, movies, iterations):
+    samples = []
+    for _ in range(iterations):
+        for mv in movies:
+            t0 = time.perf_counter()
+            main.MovieCard(mv)
+            samples.append(time.perf_counter() - t0)
+    return summarize(samples)
+
+
+def bench_grid(main, app, clock, iterations, expected, timeout):
+    first, full = [], []
+    for _ in range(iterations):
+        main.response_cache.clear()
+        gen = app._start_load()
+        app._clear_grid()
+        clock.tick()
+        t0 = time.perf_counter()
+        app.data.submit(app._load_cat('Popular', gen), key='grid')
+        tick_until(clock, lambda: app.grid.data, timeout)
+        first.append(time.perf_counter() - t0)
+        tick_until(clock, lambda: len(app.grid.data) >= expected, timeout)
+        full.append(time.perf_counter() - t0)
+    return summarize(first), summarize(full, expected)
+
+
+def bench_detail(main, app, clock, iterations):
+    movies = [d['movie'] for d in app.grid.data]
+    samples = []
+    for i in range(iterations):
+        card = main.MovieCard(movies[i % len(movies)])
+        t0 = time.perf_counter()
+        app._open_detail(card)
+        samples.append(time.perf_counter() - t0)
+        clock.tick()
+    return summarize(samples)
+
+
+def compare(current, baseline):
+    lines = []
+    for name, cur in current['results'].items():
+        old = baseline.get('results', {}).get(name)
+        if not old:
+            continue
+        for key in ('p50_ms', 'p95_ms', 'p99_ms'):
+            if old[key]:
+                change = (cur[key] - old[key]) / old[key] * 100
+                lines.append(f'{name:28} {key:7} {old[key]:10.3f} -> {cur[key]:10.3f}  ({change:+.1f}%)')
+    return '\n'.join(lines)
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark data and UI hot paths against a fake TMDB.')
+    parser.add_argument('--latency-ms', type=float, default=50)
+    parser.add_argument('--per-page', type=int, default=20)
+    parser.add_argument('--overview-bytes', type=int, default=400)
+    parser.add_argument('--poster-bytes', type=int, default=30000)
+    parser.add_argument('--pages', type=int, default=3)
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--out', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='print p50/p95/p99 changes against an earlier JSON result')
+    parser.add_argument('--trace', help='write the app\'s span recorder as Chrome trace JSON to this file')
+    args = parser.parse_args(argv)
+
+    fake = FakeTMDb(args.latency_ms, args.per_page, overview_bytes=args.overview_bytes,
+                    poster_bytes=args.poster_bytes).start()
+    cache_dir = tempfile.mkdtemp(prefix='tmdb-bench-')
+    main = load_app_module(fake, cache_dir, args.pages)
+    from kivy.clock import Clock
+
+    results = {'parse_page': bench_parse(main, fake, args.iterations * 20)}
+    results['fetch_page_cold'], results['fetch_page_warm'] = bench_fetch(main, args.iterations, args.pages)
+
+    app = main.MoviePosterApp()
+    app.build()
+    expected = args.pages * args.per_page
+    tick_until(Clock, lambda: len(app.grid.data) >= expected, args.timeout)
+    movies = [d['movie'] for d in app.grid.data]
+
+    results['card_build'] = bench_cards(main, movies, args.iterations)
+    results['time_to_first_card'], results['time_to_full_grid'] = bench_grid(
+        main, app, Clock, args.iterations, expected, args.timeout,
+    )
+    results['open_detail'] = bench_detail(main, app, Clock, args.iterations * 5)
+    fake.stop()
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'args': vars(args),
+            'requests_served': fake.requests,
+        },
+        'results': results,
+        'spans': main.tracer.histograms(),
+    }
+    print(f"{'metric':28} {'n':>5} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'items/s':>12}")
+    for name, r in results.items():
+        print(f"{name:28} {r['count']:5d} {r['p50_ms']:10.3f} {r['p95_ms']:10.3f} "
+              f"{r['p99_ms']:10.3f} {r['throughput_per_s']:12.1f}")
+    if args.trace:
+        main.tracer.export_chrome(args.trace)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            print(compare(report, json.load(f)))
+    return report
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,187 @@
+import argparse
+import gzip
+import json
+import random
+import struct
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+LIST_ENDPOINTS = ('popular', 'top_rated', 'now_playing', 'upcoming')
+GENRE_IDS = (28, 12, 16, 35, 80, 99, 18, 10751, 14, 36, 27, 10402, 9648, 10749, 878, 53)
+WORDS = (
+    'a young hero must face an ancient evil while a family secret threatens '
+    'the city space crew discovers strange signal from beyond the stars and '
+    'two rivals learn to trust each other on a dangerous road trip across'
+).split()
+
+
+def _chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+def make_png(width, height, size, seed):
+    rng = random.Random(seed)
+    color = bytes(rng.randrange(256) for _ in range(3))
+    raw = b''.join(b'\0' + color * width for _ in range(height))
+    png = b'\x89PNG\r\n\x1a\n'
+    png += _chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+    png += _chunk(b'IDAT', zlib.compress(raw))
+    pad = size - len(png) - 12 - 12
+    if pad > 0:
+        png += _chunk(b'tEXt', b'pad\0' + bytes(rng.randrange(32, 127) for _ in range(pad - 4)))
+    return png + _chunk(b'IEND', b'')
+
+
+class FakeTMDb:
+    def __init__(self, latency_ms=50, per_page=20, total_pages=50,
+                 overview_bytes=400, poster_bytes=30000, poster_size=(342, 513)):
+        self.latency = latency_ms / 1000.0
+        self.per_page = per_page
+        self.total_pages = total_pages
+        self.overview_bytes = overview_bytes
+        self.poster_bytes = poster_bytes
+        self.poster_size = poster_size
+        self.requests = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        self._posters = {}
+        self._movies = {}
+        self._server = None
+        self._thread = None
+
+    def movie(self, key, index):
+        rng = random.Random(f'{key}:{index}')
+        words = []
+        while sum(len(w) + 1 for w in words) < self.overview_bytes:
+            words.append(rng.choice(WORDS))
+        mid = zlib.crc32(f'{key}:{index}'.encode()) % 900000 + 1000
+        movie = self._movies[mid] = {
+            'id': mid,
+            'title': ' '.join(rng.choice(WORDS).title() for _ in range(rng.randint(1, 4))),
+            'overview': ' '.join(words)[:self.overview_bytes],
+            'release_date': f'{rng.randint(1960, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+            'poster_path': f'/p{mid}.png',
+            'vote_average': round(rng.uniform(3, 9), 1),
+            'vote_count': rng.randint(0, 20000),
+            'popularity': round(rng.uniform(1, 500), 3),
+            'genre_ids': rng.sample(GENRE_IDS, rng.randint(1, 3)),
+            'adult': False,
+        }
+        return movie
+
+    def page(self, key, page):
+        start = (page - 1) * self.per_page
+        return {
+            'page': page,
+            'results': [self.movie(key, start + i) for i in range(self.per_page)],
+            'total_pages': self.total_pages,
+            'total_results': self.total_pages * self.per_page,
+        }
+
+    def poster(self, name):
+        with self._lock:
+            data = self._posters.get(name)
+            if data is None:
+                data = self._posters[name] = make_png(*self.poster_size, self.poster_bytes, name)
+            return data
+
+    def handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out in separate writes; without this Nagle
+            # plus delayed ACKs add ~40 ms to every kept-alive response.
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body, ctype, headers=None):
+                self.send_response(status)
+                self.send_header('Content-Type', ctype)
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_json(self, body):
+                etag = f'"{zlib.crc32(body):08x}"'
+                if self.headers.get('If-None-Match') == etag:
+                    with fake._lock:
+                        fake.not_modified += 1
+                    return self._send(304, b'', 'application/json', {'ETag': etag})
+                headers = {'ETag': etag}
+                if 'gzip' in (self.headers.get('Accept-Encoding') or ''):
+                    body = gzip.compress(body, 5)
+                    headers['Content-Encoding'] = 'gzip'
+                self._send(200, body, 'application/json', headers)
+
+            def do_GET(self):
+                with fake._lock:
+                    fake.requests += 1
+                time.sleep(fake.latency)
+                url = urlparse(self.path)
+                parts = [p for p in url.path.split('/') if p]
+                qs = parse_qs(url.query)
+                page = int(qs.get('page', ['1'])[0])
+                if parts[:2] == ['3', 'movie'] and len(parts) == 3 and parts[2] in LIST_ENDPOINTS:
+                    body = fake.page(parts[2], page)
+                elif parts[:2] == ['3', 'movie'] and len(parts) == 3 and parts[2].isdigit() \
+                        and int(parts[2]) in fake._movies:
+                    body = dict(fake._movies[int(parts[2])])
+                    body['genres'] = [{'id': g, 'name': str(g)} for g in body.pop('genre_ids')]
+                elif parts[:3] == ['3', 'search', 'movie']:
+                    body = fake.page('search:' + qs.get('query', [''])[0], page)
+                elif parts[:2] == ['t', 'p'] and len(parts) == 4:
+                    return self._send(200, fake.poster(parts[3]), 'image/png')
+                else:
+                    body = {'success': False, 'status_code': 34,
+                            'status_message': 'The resource you requested could not be found.'}
+                    return self._send(404, json.dumps(body).encode(), 'application/json')
+                self._send_json(json.dumps(body).encode())
+
+        return Handler
+
+    def start(self, host='127.0.0.1', port=0):
+        self._server = ThreadingHTTPServer((host, port), self.handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve a fake TMDB API for offline testing.')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=50)
+    parser.add_argument('--per-page', type=int, default=20)
+    parser.add_argument('--overview-bytes', type=int, default=400)
+    parser.add_argument('--poster-bytes', type=int, default=30000)
+    args = parser.parse_args(argv)
+    fake = FakeTMDb(args.latency_ms, args.per_page, overview_bytes=args.overview_bytes,
+                    poster_bytes=args.poster_bytes).start(port=args.port)
+    print(f'Fake TMDB at {fake.url}/3 (images at {fake.url}/t/p)')
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == '__main__':
+    main()
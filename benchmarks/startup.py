@@ -0,0 +1,64 @@
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, HERE)
+
+from fake_tmdb import FakeTMDb
+
+STARTUP_RE = re.compile(r'(imports \d+ ms.*first_card \d+ ms)', re.M)
+PHASE_RE = re.compile(r'(\w+) (\d+) ms')
+
+
+def run_once(fake, cache_dir, timeout):
+    env = dict(os.environ)
+    env.update({
+        'TMDB_API_KEY': 'benchmark',
+        'TMDB_API_BASE': fake.url + '/3',
+        'TMDB_IMAGE_BASE': fake.url + '/t/p',
+        'TMDB_CACHE_DIR': cache_dir,
+        'TMDB_STARTUP_PROFILE': '1',
+        'KIVY_NO_ARGS': '1',
+        'KIVY_NO_FILELOG': '1',
+    })
+    env.setdefault('KIVY_GL_BACKEND', 'mock')
+    env.setdefault('SDL_VIDEODRIVER', 'offscreen')
+    proc = subprocess.run([sys.executable, os.path.join(ROOT, 'main.py')], env=env,
+                          capture_output=True, text=True, timeout=timeout)
+    match = STARTUP_RE.search(proc.stderr + proc.stdout)
+    if not match:
+        raise RuntimeError(f'no startup profile in output:\n{proc.stderr[-2000:]}')
+    return {name: float(ms) for name, ms in PHASE_RE.findall(match.group(1))}
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description='Measure cold start (imports, build, first paint, first card).')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--latency-ms', type=float, default=50)
+    parser.add_argument('--warm-cache', action='store_true', help='keep the response cache and grid snapshot between runs')
+    parser.add_argument('--timeout', type=float, default=60)
+    args = parser.parse_args(argv)
+
+    fake = FakeTMDb(args.latency_ms).start()
+    runs = []
+    shared = tempfile.mkdtemp(prefix='tmdb-startup-')
+    for _ in range(args.runs):
+        cache_dir = shared if args.warm_cache else tempfile.mkdtemp(prefix='tmdb-startup-')
+        runs.append(run_once(fake, cache_dir, args.timeout))
+    fake.stop()
+
+    print(f"{'phase':12} {'median ms':>10} {'min ms':>8} {'max ms':>8}")
+    for phase in runs[0]:
+        values = [r[phase] for r in runs if phase in r]
+        print(f'{phase:12} {statistics.median(values):10.0f} {min(values):8.0f} {max(values):8.0f}')
+    return runs
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,286 @@
+import argparse
+import gzip
+import json
+import logging
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+
+import numpy as np
+
+MAGIC = b'TMDBCAT1'
+ALIGN = 8
+FLUSH_ROWS = 10000
+TOP_RATED_MIN_VOTES = 300
+
+NUMERIC_COLUMNS = (
+    ('id', 'I'),
+    ('vote_average', 'f'),
+    ('vote_count', 'I'),
+    ('popularity', 'f'),
+    ('release', 'I'),
+    ('genres', 'I'),
+)
+STRING_COLUMNS = ('title', 'overview', 'poster_path')
+DTYPES = {'I': '<u4', 'f': '<f4', 'Q': '<u8'}
+
+
+def _open_source(path):
+    if path == '-':
+        return sys.stdin
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, encoding='utf-8')
+
+
+def _release_int(date):
+    digits = (date or '').replace('-', '')
+    return int(digits) if len(digits) == 8 and digits.isdigit() else 0
+
+
+def _text(value):
+    if value is None:
+        return ''
+    return value if isinstance(value, str) else str(value)
+
+
+def _title(rec):
+    # The bulk ID exports only carry original_title.
+    return _text(rec.get('title') or rec.get('original_title'))
+
+
+def _genre_ids(rec):
+    if rec.get('genre_ids') is not None:
+        return rec['genre_ids']
+    return [g['id'] for g in rec.get('genres') or [] if isinstance(g, dict) and 'id' in g]
+
+
+class _ColumnWriter:
+    def __init__(self, folder):
+        self.folder = folder
+        self.rows = 0
+        self.genre_table = []
+        self.dropped_genres = set()
+        self._genre_bits = {}
+        self._num = {name: array(code) for name, code in NUMERIC_COLUMNS}
+        self._num_files = {name: open(os.path.join(folder, name), 'wb') for name, _ in NUMERIC_COLUMNS}
+        self._blob_files = {name: open(os.path.join(folder, name + '.blob'), 'wb') for name in STRING_COLUMNS}
+        self._offsets = {name: array('Q', [0]) for name in STRING_COLUMNS}
+        self._offset_files = {name: open(os.path.join(folder, name + '.off'), 'wb') for name in STRING_COLUMNS}
+        self._ends = dict.fromkeys(STRING_COLUMNS, 0)
+
+    def _genre_mask(self, ids):
+        mask = 0
+        for gid in ids:
+            bit = self._genre_bits.get(gid)
+            if bit is None:
+                if len(self.genre_table) >= 32:
+                    self.dropped_genres.add(gid)
+                    continue
+                bit = self._genre_bits[gid] = len(self.genre_table)
+                self.genre_table.append(gid)
+            mask |= 1 << bit
+        return mask
+
+    def add(self, rec):
+        # Parse everything before appending so a bad row cannot misalign columns.
+        values = (
+            int(rec['id']),
+            float(rec.get('vote_average') or 0),
+            int(rec.get('vote_count') or 0),
+            float(rec.get('popularity') or 0),
+            _release_int(rec.get('release_date')),
+            self._genre_mask(_genre_ids(rec)),
+        )
+        strings = [
+            (_title(rec) if name == 'title' else _text(rec.get(name))).encode('utf-8')
+            for name in STRING_COLUMNS
+        ]
+        for (name, _), value in zip(NUMERIC_COLUMNS, values):
+            self._num[name].append(value)
+        for name, data in zip(STRING_COLUMNS, strings):
+            self._blob_files[name].write(data)
+            self._ends[name] += len(data)
+            self._offsets[name].append(self._ends[name])
+        self.rows += 1
+        if self.rows % FLUSH_ROWS == 0:
+            self.flush()
+
+    def flush(self):
+        for name, _ in NUMERIC_COLUMNS:
+            self._num[name].tofile(self._num_files[name])
+            del self._num[name][:]
+        for name in STRING_COLUMNS:
+            self._offsets[name].tofile(self._offset_files[name])
+            del self._offsets[name][:]
+
+    def close(self):
+        self.flush()
+        for f in (*self._num_files.values(), *self._blob_files.values(), *self._offset_files.values()):
+            f.close()
+
+
+def _write_order(folder, name, order):
+    order.astype('<u4').tofile(os.path.join(folder, name))
+
+
+def ingest(src, dest, min_votes=TOP_RATED_MIN_VOTES):
+    folder = tempfile.mkdtemp(prefix='catalog-', dir=os.path.dirname(os.path.abspath(dest)))
+    tmp = dest + '.part'
+    skipped = 0
+    try:
+        writer = _ColumnWriter(folder)
+        try:
+            with _open_source(src) as lines:
+                for line in lines:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        rec = json.loads(line)
+                        if not isinstance(rec, dict):
+                            skipped += 1
+                            continue
+                        if rec.get('adult') or not _title(rec):
+                            continue
+                        writer.add(rec)
+                    except (ValueError, KeyError, TypeError, AttributeError, OverflowError):
+                        skipped += 1
+        finally:
+            writer.close()
+        rows = writer.rows
+
+        popularity = np.fromfile(os.path.join(folder, 'popularity'), dtype='<f4')
+        _write_order(folder, 'order_popular', np.argsort(-popularity, kind='stable'))
+        del popularity
+        votes = np.fromfile(os.path.join(folder, 'vote_count'), dtype='<u4')
+        rating = np.fromfile(os.path.join(folder, 'vote_average'), dtype='<f4')
+        eligible = np.flatnonzero(votes >= min_votes)
+        _write_order(folder, 'order_top_rated', eligible[np.argsort(-rating[eligible], kind='stable')])
+        del votes, rating, eligible
+
+        sections = [(name, code) for name, code in NUMERIC_COLUMNS]
+        sections += [(name + '.off', 'Q') for name in STRING_COLUMNS]
+        sections += [('order_popular', 'I'), ('order_top_rated', 'I')]
+        sections += [(name + '.blob', 'B') for name in STRING_COLUMNS]
+
+        table = {}
+        offset = 0
+        for name, code in sections:
+            size = os.path.getsize(os.path.join(folder, name))
+            table[name] = [offset, size, code]
+            offset += size + (-size % ALIGN)
+        header = json.dumps({
+            'rows': rows, 'genres': writer.genre_table, 'sections': table,
+        }).encode('utf-8')
+        base = len(MAGIC) + 4 + len(header)
+        base += -base % ALIGN
+
+        with open(tmp, 'wb') as out:
+            out.write(MAGIC + struct.pack('<I', len(header)) + header)
+            out.write(b'\0' * (base - out.tell()))
+            for name, _ in sections:
+                with open(os.path.join(folder, name), 'rb') as f:
+                    shutil.copyfileobj(f, out, 1 << 20)
+                out.write(b'\0' * (-table[name][1] % ALIGN))
+        os.replace(tmp, dest)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    if skipped:
+        logging.warning(f"Catalog ingest skipped {skipped} malformed rows")
+    if writer.dropped_genres:
+        logging.warning(f"Catalog genre mask is full; ignored genre ids {sorted(writer.dropped_genres)}")
+    return rows
+
+
+class Catalog:
+    LISTS = {'popular': 'order_popular', 'top_rated': 'order_top_rated'}
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a movie catalog")
+        (hlen,) = struct.unpack_from('<I', self._mm, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(self._mm[start:start + hlen])
+        base = start + hlen
+        base += -base % ALIGN
+        self.rows = header['rows']
+        self.genre_table = header['genres']
+        self._cols = {}
+        for name, (offset, size, code) in header['sections'].items():
+            if code == 'B':
+                self._cols[name] = (base + offset, size)
+            else:
+                dtype = np.dtype(DTYPES[code])
+                self._cols[name] = np.frombuffer(
+                    self._mm, dtype=dtype, count=size // dtype.itemsize, offset=base + offset,
+                )
+
+    def __len__(self):
+        return self.rows
+
+    def _string(self, name, i):
+        offsets = self._cols[name + '.off']
+        start, _ = self._cols[name + '.blob']
+        lo, hi = int(offsets[i]), int(offsets[i + 1])
+        return self._mm[start + lo:start + hi].decode('utf-8')
+
+    def row(self, i):
+        c = self._cols
+        release = int(c['release'][i])
+        mask = int(c['genres'][i])
+        return {
+            'id': int(c['id'][i]),
+            'title': self._string('title', i),
+            'overview': self._string('overview', i),
+            'poster_path': self._string('poster_path', i),
+            'release_date': f"{release // 10000:04d}-{release // 100 % 100:02d}-{release % 100:02d}" if release else '',
+            'vote_average': round(float(c['vote_average'][i]), 3),
+            'genre_ids': [g for b, g in enumerate(self.genre_table) if mask >> b & 1],
+        }
+
+    def page(self, name, page_number, per_page=20):
+        order = self._cols[self.LISTS[name]]
+        start = (page_number - 1) * per_page
+        return [self.row(int(i)) for i in order[start:start + per_page]]
+
+    def titles(self, name, limit=None):
+        order = self._cols[self.LISTS[name]]
+        ids = self._cols['id']
+        for i in order[:limit]:
+            i = int(i)
+            yield int(ids[i]), self._string('title', i)
+
+    def close(self):
+        self._cols = {}
+        self._mm.close()
+        self._file.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build an offline movie catalog.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    ing = sub.add_parser('ingest', help='convert a newline-delimited JSON movie dump')
+    ing.add_argument('source', help="dump file (.json/.ndjson, optionally .gz) or '-' for stdin")
+    ing.add_argument('dest', help='catalog file to write')
+    ing.add_argument('--min-votes', type=int, default=TOP_RATED_MIN_VOTES,
+                     help='minimum vote count for the Top Rated list')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s:%(levelname)s:%(message)s')
+    rows = ingest(args.source, args.dest, args.min_votes)
+    logging.info(f"Wrote {rows} movies to {args.dest}")
+
+
+if __name__ == '__main__':
+    main()
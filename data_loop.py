@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_CONCURRENCY = 3
+CALL_CONCURRENCY = 2
+
+
+class DataLoop:
+    def __init__(self, max_concurrency=DEFAULT_CONCURRENCY, name='data-loop'):
+        self.max_concurrency = max_concurrency
+        self.loop = asyncio.new_event_loop()
+        # A fixed pool replaces a thread per action. Page fetches and other
+        # calls (index building, file IO) each hold their own permits and the
+        # pool has a worker for every permit, so neither can starve the other.
+        self.pool = ThreadPoolExecutor(max_workers=max_concurrency + CALL_CONCURRENCY, thread_name_prefix='data')
+        self.loop.set_default_executor(self.pool)
+        self.submitted = 0
+        self.cancelled = 0
+        self.failed = 0
+        self.running = 0
+        self.peak = 0
+        self._limit = asyncio.Semaphore(max_concurrency)
+        self._calls = asyncio.Semaphore(CALL_CONCURRENCY)
+        self._keyed = {}
+        self._lock = threading.Lock()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+        pending = asyncio.all_tasks(self.loop)
+        if pending:
+            self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        self.loop.close()
+
+    def submit(self, coro, key=None):
+        if self._stopped:
+            coro.close()
+            return None
+        fut = asyncio.run_coroutine_threadsafe(self._guard(coro), self.loop)
+        with self._lock:
+            self.submitted += 1
+            if key is None:
+                return fut
+            # A newer action with the same key supersedes the old one, so a
+            # category switch cancels the previous load instead of orphaning it.
+            old = self._keyed.get(key)
+            self._keyed[key] = fut
+        if old is not None and old.cancel():
+            with self._lock:
+                self.cancelled += 1
+        fut.add_done_callback(lambda f: self._forget(key, f))
+        return fut
+
+    def cancel(self, key):
+        with self._lock:
+            fut = self._keyed.pop(key, None)
+        if fut is not None and fut.cancel():
+            with self._lock:
+                self.cancelled += 1
+
+    def _forget(self, key, fut):
+        with self._lock:
+            if self._keyed.get(key) is fut:
+                del self._keyed[key]
+
+    async def _guard(self, coro):
+        try:
+            return await coro
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            with self._lock:
+                self.failed += 1
+            logging.error(f"Data task error: {e}")
+
+    async def blocking(self, func, *args):
+        await self._limit.acquire()
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            fut = self.loop.run_in_executor(self.pool, func, *args)
+        except BaseException:
+            self._release()
+            raise
+        # The permit follows the worker, not the awaiting task: a cancelled
+        # caller leaves a running fetch to finish before another may start.
+        fut.add_done_callback(lambda f: self._release())
+        return await asyncio.shield(fut)
+
+    def _release(self):
+        with self._lock:
+            self.running -= 1
+        self._limit.release()
+
+    async def call(self, func, *args):
+        await self._calls.acquire()
+        try:
+            fut = self.loop.run_in_executor(self.pool, func, *args)
+        except BaseException:
+            self._calls.release()
+            raise
+        fut.add_done_callback(lambda f: self._calls.release())
+        return await asyncio.shield(fut)
+
+    async def pages(self, func, count, *args, first=1):
+        tasks = [self.loop.create_task(self.blocking(func, *args, p)) for p in range(first, first + count)]
+        try:
+            for task in tasks:
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'submitted': self.submitted, 'cancelled': self.cancelled, 'failed': self.failed,
+                'running': self.running, 'peak': self.peak,
+            }
+
+    def stop(self, timeout=2.0):
+        if self._stopped:
+            return
+        self._stopped = True
+
+        def shutdown():
+            for task in asyncio.all_tasks(self.loop):
+                task.cancel()
+            self.loop.stop()
+        self.loop.call_soon_threadsafe(shutdown)
+        self._thread.join(timeout)
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,98 @@
+YEAR_BUCKETS = (
+    ('2020s', 2020, 9999),
+    ('2010s', 2010, 2019),
+    ('2000s', 2000, 2009),
+    ('1990s', 1990, 1999),
+    ('Older', 1, 1989),
+)
+RATING_BUCKETS = (('8+', 8.0), ('7+', 7.0), ('6+', 6.0), ('5+', 5.0))
+
+
+def year_bucket(movie):
+    try:
+        year = int(movie.release_date[:4])
+    except ValueError:
+        return None
+    for name, lo, hi in YEAR_BUCKETS:
+        if lo <= year <= hi:
+            return name
+    return None
+
+
+class FacetIndex:
+    # Each loaded movie gets one bit, and every facet value is a Python int
+    # used as a bitset, so a combined filter is two ANDs and a count is
+    # int.bit_count(). Only touched from the UI thread.
+    def __init__(self, genres):
+        self.genres = dict(genres)
+        self.movies = []
+        self._rows = {}
+        self.all = 0
+        self.genre_bits = {g: 0 for g in self.genres}
+        self.year_bits = {name: 0 for name, _, _ in YEAR_BUCKETS}
+        self.rating_bits = {name: 0 for name, _ in RATING_BUCKETS}
+
+    def __len__(self):
+        return len(self.movies)
+
+    def clear(self):
+        self.movies = []
+        self._rows = {}
+        self.all = 0
+        self.genre_bits = dict.fromkeys(self.genre_bits, 0)
+        self.year_bits = dict.fromkeys(self.year_bits, 0)
+        self.rating_bits = dict.fromkeys(self.rating_bits, 0)
+
+    def add(self, movie):
+        row = self._rows.get(movie.id)
+        if row is not None:
+            return row
+        row = self._rows[movie.id] = len(self.movies)
+        self.movies.append(movie)
+        bit = 1 << row
+        self.all |= bit
+        for g in movie.genre_ids:
+            if g in self.genre_bits:
+                self.genre_bits[g] |= bit
+        bucket = year_bucket(movie)
+        if bucket is not None:
+            self.year_bits[bucket] |= bit
+        # Rating buckets are cumulative ("7+" includes 8+), so a minimum
+        # rating is a single bitset rather than a union.
+        for name, floor in RATING_BUCKETS:
+            if movie.vote_average >= floor:
+                self.rating_bits[name] |= bit
+        return row
+
+    def select(self, genre=None, year=None, rating=None):
+        bits = self.all
+        if genre is not None:
+            bits &= self.genre_bits.get(genre, 0)
+        if year is not None:
+            bits &= self.year_bits.get(year, 0)
+        if rating is not None:
+            bits &= self.rating_bits.get(rating, 0)
+        return bits
+
+    def accepts(self, movie, genre=None, year=None, rating=None):
+        row = self._rows.get(movie.id)
+        return row is not None and self.select(genre, year, rating) >> row & 1 == 1
+
+    def movies_in(self, bits):
+        # The reversed binary string puts bit i at index i, which is far
+        # cheaper than peeling bits off a large int one at a time.
+        movies = self.movies
+        return [movies[i] for i, c in enumerate(bin(bits)[:1:-1]) if c == '1']
+
+    def counts(self, genre=None, year=None, rating=None):
+        # Each facet is counted against the other two, so the numbers say
+        # what picking that value would show.
+        by_genre = self.select(None, year, rating)
+        by_year = self.select(genre, None, rating)
+        by_rating = self.select(genre, year, None)
+        return {
+            'total': self.select(genre, year, rating).bit_count(),
+            'genre': {g: (by_genre & b).bit_count() for g, b in self.genre_bits.items()},
+            'year': {y: (by_year & b).bit_count() for y, b in self.year_bits.items()},
+            'rating': {r: (by_rating & b).bit_count() for r, b in self.rating_bits.items()},
+        }
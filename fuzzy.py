@@ -0,0 +1,117 @@
+import re
+import threading
+import unicodedata
+from array import array
+
+import numpy as np
+
+NON_ALNUM = re.compile(r"[^a-z0-9]+")
+MAX_CANDIDATES = 64
+
+
+def normalize(text):
+    folded = unicodedata.normalize('NFKD', (text or '').lower())
+    folded = folded.encode('ascii', 'ignore').decode('ascii')
+    return NON_ALNUM.sub(' ', folded).strip()
+
+
+def trigrams(norm):
+    padded = f'  {norm} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def bounded_distance(a, b, limit):
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i] + [0] * len(b)
+        best = i
+        for j, cb in enumerate(b, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+            if cur[j] < best:
+                best = cur[j]
+        if best > limit:
+            return limit + 1
+        prev = cur
+    return prev[-1]
+
+
+class FuzzyTitleIndex:
+    def __init__(self):
+        self.titles = []
+        self._norms = []
+        self._movie_ids = []
+        self._by_norm = {}
+        self._postings = {}
+        self._frozen = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.titles)
+
+    def add(self, movie_id, title):
+        norm = normalize(title)
+        if not norm:
+            return
+        with self._lock:
+            tid = self._by_norm.get(norm)
+            if tid is not None:
+                if movie_id not in self._movie_ids[tid]:
+                    self._movie_ids[tid].append(movie_id)
+                return
+            tid = self._by_norm[norm] = len(self.titles)
+            self.titles.append(title)
+            self._norms.append(norm)
+            self._movie_ids.append([movie_id])
+            for gram in trigrams(norm):
+                posting = self._postings.get(gram)
+                if posting is None:
+                    posting = self._postings[gram] = array('I')
+                posting.append(tid)
+                self._frozen.pop(gram, None)
+
+    def add_movies(self, movies):
+        for mv in movies:
+            self.add(mv.id, mv.title)
+
+    def _posting(self, gram):
+        arr = self._frozen.get(gram)
+        if arr is None:
+            posting = self._postings.get(gram)
+            if posting is None:
+                return None
+            arr = self._frozen[gram] = np.frombuffer(posting.tobytes(), dtype=np.uint32)
+        return arr
+
+    def match(self, query, limit=10, max_distance=None):
+        norm = normalize(query)
+        if not norm:
+            return []
+        if max_distance is None:
+            max_distance = max(1, len(norm) // 4)
+        grams = trigrams(norm)
+        with self._lock:
+            if not self.titles:
+                return []
+            lists = [p for p in (self._posting(g) for g in grams) if p is not None]
+            if not lists:
+                return []
+            counts = np.bincount(np.concatenate(lists), minlength=len(self.titles))
+            # An edit touches at most three trigrams, so anything sharing fewer
+            # cannot be within max_distance.
+            need = max(1, len(grams) - 3 * max_distance)
+            cand = np.flatnonzero(counts >= need)
+            if len(cand) > MAX_CANDIDATES:
+                cand = cand[np.argpartition(-counts[cand], MAX_CANDIDATES - 1)[:MAX_CANDIDATES]]
+            norms = [self._norms[t] for t in cand]
+            scored = []
+            for tid, other in zip(cand, norms):
+                dist = bounded_distance(norm, other, max_distance)
+                if dist <= max_distance:
+                    scored.append((dist, -counts[tid], int(tid)))
+            scored.sort()
+            return [
+                (self.titles[tid], dist, list(self._movie_ids[tid]))
+                for dist, _, tid in scored[:limit]
+            ]
@@ -1,9 +1,13 @@
+import time
+_STARTUP_T0 = time.perf_counter_ns()
+
 import os
-import sys
 import logging
 import threading
+from collections import OrderedDict, deque
+from contextlib import aclosing
+from functools import partial
 from typing import List, Optional, Dict
-from dotenv import load_dotenv
 
 from kivy.config import Config
 Config.set('kivy', 'keyboard_mode', 'system')
@@ -13,32 +17,72 @@ from kivy.clock import Clock, mainthread
 from kivy.core.window import Window
 from kivy.graphics import Color, Rectangle, RoundedRectangle
 from kivy.metrics import dp
-from kivy.properties import StringProperty, NumericProperty
+from kivy.properties import BooleanProperty, StringProperty, NumericProperty
 from kivy.uix.behaviors import ButtonBehavior
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
-from kivy.uix.gridlayout import GridLayout
 from kivy.uix.image import AsyncImage
 from kivy.uix.label import Label
 from kivy.uix.popup import Popup
+from kivy.uix.recyclegridlayout import RecycleGridLayout
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
 from kivy.uix.screenmanager import ScreenManager, Screen, SlideTransition
 from kivy.uix.scrollview import ScrollView
+from kivy.uix.spinner import Spinner
 from kivy.uix.textinput import TextInput
 from kivy.uix.widget import Widget
-from tmdbv3api import TMDb, Movie
-from tmdbv3api.exceptions import TMDbException
-
-_script_dir = os.path.dirname(os.path.abspath(__file__))
-load_dotenv(os.path.join(_script_dir, '.env'))
-
-logging.basicConfig(level=logging.INFO, format='%(asctime)s:%(levelname)s:%(message)s')
-
-api_key = os.getenv('TMDB_API_KEY')
-if not api_key:
-    logging.error("TMDB_API_KEY not found in .env file")
 
-tmdb = TMDb()
-tmdb.api_key = api_key or ''
+# The TMDB client (and requests), numpy-backed modules and the offline catalog are
+# imported on first use from worker threads so the window can paint sooner.
+from movie_data import (
+    CACHE_DIR, CATALOG_LISTS, CATEGORY_ENDPOINTS, GENRES, HAVE_CATALOG, MovieDetails,
+    PAGE_COUNT, PAGE_WORKERS, api_key, catalog_page, client_stats, fetch_movie, fetch_movies,
+    get_catalog, response_cache, tmdb_session, tracer,
+)
+from data_loop import DataLoop
+from poster_decode import Image as DecodeImage, PosterDecoder
+from poster_store import PosterStore
+from poster_textures import PosterAtlas, PosterTextures
+from facets import RATING_BUCKETS, YEAR_BUCKETS, FacetIndex
+from search_index import SearchIndex
+from movie_store import MovieStore
+import snapshot
+
+POSTER_CACHE_MAX_BYTES = int(os.getenv('TMDB_POSTER_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+MOVIE_STORE_MAX_BYTES = int(os.getenv('MOVIE_STORE_MAX_BYTES', 16 * 1024 * 1024))
+GRID_COLS = 3
+FRAME_BUDGET_MS = float(os.getenv('FRAME_BUDGET_MS', 4))
+LIVE_SEARCH = os.getenv('LIVE_SEARCH', '1') != '0'
+SEARCH_DEBOUNCE_MS = float(os.getenv('SEARCH_DEBOUNCE_MS', 350))
+LOCAL_SEARCH_LIMIT = int(os.getenv('LOCAL_SEARCH_LIMIT', 30))
+FUZZY_CATALOG_TITLES = int(os.getenv('FUZZY_CATALOG_TITLES', 100000))
+PREFETCH_LIMIT = int(os.getenv('TMDB_PREFETCH_LIMIT', 12))
+PREFETCH_DELAY_MS = float(os.getenv('TMDB_PREFETCH_DELAY_MS', 250))
+TRACE_FILE = os.getenv('TMDB_TRACE_FILE')
+STARTUP_PROFILE = os.getenv('TMDB_STARTUP_PROFILE') == '1'
+INFINITE_SCROLL = os.getenv('TMDB_INFINITE_SCROLL') == '1'
+SCROLL_LOOKAHEAD = float(os.getenv('TMDB_SCROLL_LOOKAHEAD', 1.5))
+MAX_LOADED_PAGES = int(os.getenv('TMDB_MAX_LOADED_PAGES', 10))
+INITIAL_PAGES = 1 if INFINITE_SCROLL else PAGE_COUNT
+POSTER_DECODE = os.getenv('TMDB_POSTER_DECODE', '1') != '0'
+DECODE_WORKERS = int(os.getenv('TMDB_DECODE_WORKERS', 0))
+POSTER_TEXTURES = int(os.getenv('TMDB_POSTER_TEXTURES', 180))
+POSTER_ATLAS = os.getenv('TMDB_POSTER_ATLAS') == '1'
+ATLAS_PAGE_SIZE = int(os.getenv('TMDB_ATLAS_PAGE_SIZE', 2048))
+ATLAS_PAGES = int(os.getenv('TMDB_ATLAS_PAGES', 6))
+WARM_START = os.getenv('TMDB_WARM_START', '1') != '0'
+SNAPSHOT_PATH = os.getenv('TMDB_SNAPSHOT') or os.path.join(CACHE_DIR, 'snapshot.bin')
+SNAPSHOT_INTERVAL = float(os.getenv('TMDB_SNAPSHOT_INTERVAL', 60))
+
+poster_store = PosterStore(
+    os.path.join(CACHE_DIR, 'posters'), max_bytes=POSTER_CACHE_MAX_BYTES,
+    session=tmdb_session, prefetch_limit=PREFETCH_LIMIT,
+)
+poster_decoder = PosterDecoder(DECODE_WORKERS or None) if POSTER_DECODE and DecodeImage is not None else None
+if poster_decoder is not None:
+    # Fork the decode workers now, while the app is still single-threaded.
+    poster_decoder.start()
 
 BG_COLOR = (0.05, 0.05, 0.1, 1)
 CARD_COLOR = (0.12, 0.12, 0.18, 1)
@@ -52,67 +96,40 @@ SEARCH_BG = (0.1, 0.1, 0.17, 1)
 ERROR_COLOR = (0.92, 0.26, 0.21, 1)
 TAB_INACTIVE = (0.12, 0.12, 0.18, 0.7)
 
-GENRES = {
-    28: "Action", 12: "Adventure", 16: "Animation", 35: "Comedy",
-    80: "Crime", 99: "Documentary", 18: "Drama", 10751: "Family",
-    14: "Fantasy", 36: "History", 27: "Horror", 10402: "Music",
-    9648: "Mystery", 10749: "Romance", 878: "Sci-Fi", 10770: "TV Movie",
-    53: "Thriller", 10752: "War", 37: "Western",
-}
-
 
 def star_text(rating):
     filled = round((rating or 0) / 2)
     return '★' * filled + '☆' * (5 - filled)
 
 
-class MovieDetails:
-    def __init__(self, title, overview, release_date, poster_path, movie_id,
-                 vote_average=0, genre_ids=None):
-        self.title = title
-        self.overview = overview
-        self.release_date = release_date
-        self.poster_path = poster_path
-        self.id = movie_id
-        self.vote_average = vote_average or 0
-        self.genre_ids = genre_ids or []
+class PosterImage(AsyncImage):
+    # AsyncImage keeps the old loader bound when source is cleared, so a load
+    # that finishes after rebinding would hit a missing core image.
+    def _on_source_load(self, value):
+        if self._coreimage is not None:
+            super()._on_source_load(value)
 
-    @property
-    def year(self):
-        return self.release_date[:4] if self.release_date else ''
 
-    @property
-    def genre_text(self):
-        names = [GENRES.get(g, '') for g in self.genre_ids[:3]]
-        return ' • '.join(n for n in names if n)
+if POSTER_ATLAS:
+    poster_textures = PosterAtlas(ATLAS_PAGE_SIZE, ATLAS_PAGES)
+else:
+    poster_textures = PosterTextures(POSTER_TEXTURES)
 
 
-def fetch_movies(func, query=None, page_number=1):
-    try:
-        result = func(query=query, page=page_number) if query else func(page=page_number)
-        if not result:
-            return None
-        out = []
-        for m in result:
-            out.append(MovieDetails(
-                title=m.title,
-                overview=getattr(m, 'overview', ''),
-                release_date=getattr(m, 'release_date', ''),
-                poster_path=getattr(m, 'poster_path', ''),
-                movie_id=m.id,
-                vote_average=getattr(m, 'vote_average', 0),
-                genre_ids=getattr(m, 'genre_ids', []),
-            ))
-        return out
-    except Exception as e:
-        logging.error(f"Fetch error: {e}")
-        return None
+def _same_movie(a, b):
+    return all(getattr(a, f) == getattr(b, f) for f in MovieDetails.__slots__)
 
 
-class MovieCard(ButtonBehavior, BoxLayout):
-    def __init__(self, movie, **kwargs):
+class MovieCard(RecycleDataViewBehavior, ButtonBehavior, BoxLayout):
+    def __init__(self, movie=None, **kwargs):
         super().__init__(orientation='vertical', spacing=0, padding=0, **kwargs)
-        self.movie_id = movie.id
+        self.movie = None
+        self.movie_id = None
+        self.poster_path = None
+        self.poster_px = None
+        self._poster_key = None
+        self._poster_ref = None
+        self._poster_started = 0
         self.size_hint_y = None
 
         with self.canvas.before:
@@ -125,10 +142,8 @@ class MovieCard(ButtonBehavior, BoxLayout):
             size=lambda i, v: setattr(i._card_bg, 'size', v),
         )
 
-        poster_url = f"https://image.tmdb.org/t/p/w342/{movie.poster_path}"
-        self.poster = AsyncImage(
-            source=poster_url, size_hint=(1, None),
-            allow_stretch=True, keep_ratio=True,
+        self.poster = PosterImage(
+            size_hint=(1, None), allow_stretch=True, keep_ratio=True,
         )
         self.add_widget(self.poster)
 
@@ -137,45 +152,223 @@ class MovieCard(ButtonBehavior, BoxLayout):
             padding=[dp(5), dp(3)],
         )
 
-        title_lbl = Label(
-            text=movie.title, font_size='11sp', color=TEXT_PRIMARY,
+        self.title_lbl = Label(
+            font_size='11sp', color=TEXT_PRIMARY,
             halign='left', valign='middle',
             shorten=True, shorten_from='right', size_hint_y=0.5,
         )
-        title_lbl.bind(size=lambda i, s: setattr(i, 'text_size', s))
+        self.title_lbl.bind(size=lambda i, s: setattr(i, 'text_size', s))
 
         bottom_row = BoxLayout(size_hint_y=0.5)
 
-        score = f"{movie.vote_average:.1f}" if movie.vote_average else ''
-        stars_lbl = Label(
-            text=f"{star_text(movie.vote_average)} {score}",
+        self.stars_lbl = Label(
             font_size='9sp', color=GOLD,
             halign='left', valign='middle', size_hint_x=0.72,
         )
-        stars_lbl.bind(size=lambda i, s: setattr(i, 'text_size', s))
+        self.stars_lbl.bind(size=lambda i, s: setattr(i, 'text_size', s))
 
-        year_lbl = Label(
-            text=movie.year, font_size='9sp', color=TEXT_MUTED,
+        self.year_lbl = Label(
+            font_size='9sp', color=TEXT_MUTED,
             halign='right', valign='middle', size_hint_x=0.28,
         )
-        year_lbl.bind(size=lambda i, s: setattr(i, 'text_size', s))
+        self.year_lbl.bind(size=lambda i, s: setattr(i, 'text_size', s))
 
-        bottom_row.add_widget(stars_lbl)
-        bottom_row.add_widget(year_lbl)
-        info.add_widget(title_lbl)
+        bottom_row.add_widget(self.stars_lbl)
+        bottom_row.add_widget(self.year_lbl)
+        info.add_widget(self.title_lbl)
         info.add_widget(bottom_row)
         self.add_widget(info)
 
         self.bind(size=self._resize)
+        if movie is not None:
+            self.bind_movie(movie)
+
+    def bind_movie(self, movie):
+        self.movie = movie
+        self.movie_id = movie.id
+        self.title_lbl.text = movie.title
+        score = f"{movie.vote_average:.1f}" if movie.vote_average else ''
+        self.stars_lbl.text = f"{star_text(movie.vote_average)} {score}"
+        self.year_lbl.text = movie.year
+
+        if movie.poster_path != self.poster_path:
+            self.poster_path = movie.poster_path
+            self._poster_started = time.perf_counter_ns()
+            self._set_poster(poster_store.get(movie.poster_path, 'thumb', self._poster_ready))
+
+    def refresh_view_attrs(self, rv, index, data):
+        if rv.poster_px != self.poster_px:
+            self.poster_px = rv.poster_px
+            self.poster_path = None
+        self.bind_movie(data['movie'])
+
+    def _release_poster(self):
+        # Atlas cells are reused once no card holds them, so a card lets go of
+        # its region only when it stops drawing it.
+        if self._poster_ref is not None:
+            poster_textures.release(*self._poster_ref)
+            self._poster_ref = None
+            self.poster.texture = None
+
+    def _set_poster(self, path):
+        self._release_poster()
+        if not path or poster_decoder is None or not self.poster_px:
+            self._poster_key = None
+            self.poster.source = path or ''
+            return
+        key = self._poster_key = (path, *self.poster_px)
+        self.poster.source = ''
+        self.poster.texture = poster_textures.get(key)
+        if self.poster.texture is None:
+            poster_decoder.submit(path, self.poster_px, self._poster_decoded)
+        else:
+            self._poster_ref = (key, self.poster.texture)
+
+    @mainthread
+    def _poster_decoded(self, key, result):
+        if key != self._poster_key:
+            return
+        if result is None:
+            self.poster.source = key[0]
+            return
+        with tracer.span('poster_upload'):
+            self._release_poster()
+            self.poster.texture = poster_textures.upload(key, *result)
+            self._poster_ref = (key, self.poster.texture)
+
+    def on_press(self):
+        poster_store.prefetch(self.poster_path, 'w500')
+
+    def on_release(self):
+        App.get_running_app()._open_detail(self)
+
+    @mainthread
+    def _poster_ready(self, poster_path, path):
+        if poster_path == self.poster_path:
+            tracer.record('poster_load', self._poster_started, variant='thumb', ok=bool(path))
+            if path:
+                self._set_poster(path)
 
     def _resize(self, *args):
-        h = self.width * 1.5
-        self.poster.height = h
-        self.height = h + dp(50)
+        self.poster.height = max(0, self.height - dp(50))
+
+
+class PosterGrid(RecycleView):
+    overscan_rows = NumericProperty(1)
+
+    def __init__(self, cols=GRID_COLS, **kwargs):
+        super().__init__(
+            do_scroll_x=False, bar_width=dp(3), bar_color=(*ACCENT[:3], 0.4),
+            **kwargs,
+        )
+        self.poster_px = None
+        self.layout = RecycleGridLayout(
+            cols=cols, spacing=dp(5), padding=dp(3),
+            size_hint_y=None, default_size_hint=(1, None),
+        )
+        self.layout.bind(minimum_height=self.layout.setter('height'))
+        self.add_widget(self.layout)
+        # viewclass lives on the layout manager, so it can only be set once
+        # the layout is attached.
+        self.viewclass = MovieCard
+        self.bind(width=self._update_card_size)
+        self._prefetch_trigger = Clock.create_trigger(self._prefetch_visible, PREFETCH_DELAY_MS / 1000.0)
+        self.bind(scroll_y=self._prefetch_trigger, data=self._prefetch_trigger)
+        self.velocity = 0.0
+        self.anchor_shift = 0
+        self._saved_top = None
+        self.pending_top = None
+        self._last_scroll = (0.0, 0.0)
+        self.bind(scroll_y=self._track_scroll)
+
+    def _update_card_size(self, *args):
+        lay = self.layout
+        cols = lay.cols
+        card_w = (self.width - dp(6) - lay.spacing[0] * (cols - 1)) / cols
+        lay.default_size = (None, card_w * 1.5 + dp(50))
+        if card_w > 0:
+            self.poster_px = (int(card_w), int(card_w * 1.5))
+
+    def _scroll_span(self):
+        return max(0, self.layout.height - self.height)
+
+    def distance_to_start(self):
+        return (1 - self.scroll_y) * self._scroll_span()
+
+    def distance_to_end(self):
+        return self.scroll_y * self._scroll_span()
+
+    def _track_scroll(self, inst, value):
+        # Smoothed downward speed in px/s; negative while scrolling up.
+        now = time.perf_counter()
+        top = self.distance_to_start()
+        last_t, last_top = self._last_scroll
+        dt = now - last_t
+        self.velocity = 0.7 * self.velocity + 0.3 * (top - last_top) / dt if 0 < dt < 0.5 else 0.0
+        self._last_scroll = (now, top)
+
+    def shift_rows(self, count):
+        # Called before the data above the viewport changes to count items;
+        # the row delta is applied in restore_viewport once the layout has its
+        # new height. A partial row still takes a full row.
+        cols = self.layout.cols
+        rows = -(-count // cols) - -(-len(self.data) // cols)
+        pitch = (self.layout.default_size[1] or 0) + self.layout.spacing[1]
+        self.anchor_shift += rows * pitch
+
+    def scroll_to_offset(self, top):
+        # The restored cards land over several frames, so the offset is
+        # re-applied on each layout pass until the content is tall enough.
+        self.pending_top = top if top > 0 else None
+
+    def on_scroll_start(self, touch, check_children=True):
+        self.pending_top = None
+        return super().on_scroll_start(touch, check_children)
+
+    def save_viewport(self):
+        if self._saved_top is None:
+            self._saved_top = self.distance_to_start()
+
+    def restore_viewport(self):
+        # ScrollView keeps scroll_y as a ratio, so growing content would drag
+        # the view along; pin the pixel offset from the top instead.
+        top, self._saved_top = self._saved_top, None
+        shift, self.anchor_shift = self.anchor_shift, 0
+        span = self._scroll_span()
+        if self.pending_top is not None:
+            top, shift = self.pending_top, 0
+            if span >= top:
+                self.pending_top = None
+        if top is None or not span:
+            return
+        # Reset the velocity baseline first so the jump is not read as a fling.
+        self._last_scroll = (time.perf_counter(), top + shift)
+        self.scroll_y = min(1.0, max(0.0, 1 - (top + shift) / span))
+
+    def get_viewport(self):
+        x, y, w, h = super().get_viewport()
+        pad = self.overscan_rows * (self.layout.default_size[1] or 0)
+        bottom = max(0, y - pad)
+        return x, bottom, w, h + (y - bottom) + pad
+
+    def _prefetch_visible(self, *a):
+        # Runs once scrolling settles; pushing bottom-up means the top rows
+        # come off the prefetch queue first.
+        cards = sorted(self.layout.children, key=lambda c: (c.y, -c.x))
+        for card in cards:
+            poster_store.prefetch(card.poster_path, 'w500')
+
+    def card_at(self, pos):
+        for card in self.layout.children:
+            if card.collide_point(*card.to_widget(*pos)):
+                return card
+        return None
 
 
 class SearchBar(BoxLayout):
     search_text = StringProperty('')
+    live = BooleanProperty(False)
+    debounce = NumericProperty(0.35)
 
     def __init__(self, **kwargs):
         super().__init__(
@@ -183,6 +376,7 @@ class SearchBar(BoxLayout):
             spacing=dp(6), padding=[dp(4), 0], **kwargs,
         )
         self.register_event_type('on_search')
+        self._pending = None
 
         with self.canvas.before:
             Color(*SEARCH_BG)
@@ -217,14 +411,27 @@ class SearchBar(BoxLayout):
         self.input.bind(on_text_validate=self._submit)
 
     def _text_changed(self, inst, val):
+        if val == self.search_text:
+            return
         self.search_text = val
+        if self.live:
+            self._cancel_pending()
+            self._pending = Clock.schedule_once(self._submit, self.debounce)
+
+    def _cancel_pending(self):
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
 
     def _clear(self, *a):
+        # Emptying the input schedules a live search; _submit cancels it so
+        # the cleared query is dispatched once.
         self.input.text = ''
         self.search_text = ''
-        self.dispatch('on_search')
+        self._submit()
 
     def _submit(self, *a):
+        self._cancel_pending()
         self.dispatch('on_search')
 
     def on_search(self):
@@ -255,30 +462,333 @@ class CategoryBar(BoxLayout):
     def _pick(self, name):
         if name == self.active:
             return
+        self.select(name)
+        self.dispatch('on_category', name)
+
+    def select(self, name):
         self.active = name
         for n, b in self._btns.items():
             b.background_color = ACCENT if n == name else TAB_INACTIVE
             b.bold = (n == name)
-        self.dispatch('on_category', name)
 
     def on_category(self, *a):
         pass
 
 
+class FilterBar(BoxLayout):
+    def __init__(self, genres, **kwargs):
+        super().__init__(
+            orientation='horizontal', size_hint_y=None, height=dp(34),
+            spacing=dp(5), padding=[dp(2), dp(2)], **kwargs,
+        )
+        self.register_event_type('on_filter')
+        self.selected = {'genre': None, 'year': None, 'rating': None}
+        self._options = {
+            'genre': [(None, 'Any genre')] + sorted(genres.items(), key=lambda kv: kv[1]),
+            'year': [(None, 'Any year')] + [(name, name) for name, _, _ in YEAR_BUCKETS],
+            'rating': [(None, 'Any rating')] + [(name, f'{name} ★') for name, _ in RATING_BUCKETS],
+        }
+        self._labels = {}
+        self._spinners = {}
+        for facet, options in self._options.items():
+            self._labels[facet] = {label: value for value, label in options}
+            sp = Spinner(
+                text=options[0][1], values=[label for _, label in options],
+                background_normal='', background_color=SURFACE_COLOR,
+                color=TEXT_PRIMARY, font_size='12sp',
+            )
+            sp.bind(text=lambda inst, text, f=facet: self._pick(f, text))
+            self._spinners[facet] = sp
+            self.add_widget(sp)
+
+    def _pick(self, facet, text):
+        value = self._labels[facet].get(text)
+        if value == self.selected[facet]:
+            return
+        self.selected[facet] = value
+        self.dispatch('on_filter', dict(self.selected))
+
+    def set_counts(self, counts):
+        for facet, options in self._options.items():
+            chosen = self.selected[facet]
+            labels = {}
+            for value, label in options:
+                if value is not None:
+                    n = counts[facet].get(value, 0)
+                    if not n and value != chosen:
+                        continue
+                    label = f'{label} ({n})'
+                labels[label] = value
+            self._labels[facet] = labels
+            sp = self._spinners[facet]
+            sp.values = list(labels)
+            sp.text = next(label for label, value in labels.items() if value == chosen)
+
+    @property
+    def active(self):
+        return any(v is not None for v in self.selected.values())
+
+    def on_filter(self, *a):
+        pass
+
+
+class PageFeed:
+    def __init__(self, fetch, gen, pages, latency=0.5, first=1):
+        self.fetch = fetch
+        self.gen = gen
+        self.pages = OrderedDict(enumerate(pages, first))
+        self.busy = False
+        self.exhausted = False
+        self.latency = latency
+
+    @property
+    def first(self):
+        return next(iter(self.pages))
+
+    @property
+    def last(self):
+        return next(reversed(self.pages))
+
+
+class CardQueue:
+    def __init__(self, build_card, budget_ms=FRAME_BUDGET_MS):
+        self.build_card = build_card
+        self.budget = budget_ms / 1000.0
+        self.frames = 0
+        self.built = 0
+        self.token = 0
+        self._items = deque()
+        self._event = None
+
+    def push(self, movies, token=0):
+        self._items.extend((token, mv) for mv in movies)
+        self._kick()
+
+    @mainthread
+    def _kick(self):
+        if self._event is None and self._items:
+            self._event = Clock.schedule_interval(self._drain, 0)
+
+    def clear(self, token):
+        self.token = token
+        self._items.clear()
+        self.frames = 0
+        self.built = 0
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    def _drain(self, dt):
+        deadline = time.perf_counter() + self.budget
+        while self._items:
+            token, movie = self._items.popleft()
+            if token != self.token:
+                continue
+            self.build_card(movie)
+            self.built += 1
+            if time.perf_counter() >= deadline:
+                break
+        self.frames += 1
+        if self._items:
+            return True
+        self._event = None
+        logging.info(f"Grid populated: {self.built} cards in {self.frames} frames")
+        return False
+
+
+class DetailView(BoxLayout):
+    def __init__(self, on_back, similar_count=10, **kwargs):
+        super().__init__(orientation='vertical', **kwargs)
+        self.movie = None
+        self._poster_started = 0
+        self._wrapped = []
+
+        with self.canvas.before:
+            Color(*BG_COLOR)
+            self._bg = Rectangle(pos=self.pos, size=self.size)
+        self.bind(
+            pos=lambda i, v: setattr(i._bg, 'pos', v),
+            size=lambda i, v: setattr(i._bg, 'size', v),
+        )
+
+        top = BoxLayout(size_hint_y=None, height=dp(48), padding=[dp(6), dp(4)], spacing=dp(6))
+        with top.canvas.before:
+            Color(*CARD_COLOR)
+            top._bg = Rectangle(pos=top.pos, size=top.size)
+        top.bind(
+            pos=lambda i, v: setattr(i._bg, 'pos', v),
+            size=lambda i, v: setattr(i._bg, 'size', v),
+        )
+
+        back = Button(
+            text='← Back', size_hint_x=0.22,
+            background_normal='', background_color=ACCENT,
+            color=TEXT_PRIMARY, font_size='13sp', bold=True,
+        )
+        back.bind(on_release=on_back)
+
+        self.top_title = Label(
+            font_size='15sp', bold=True,
+            color=TEXT_PRIMARY, shorten=True, shorten_from='right',
+            halign='center', size_hint_x=0.78,
+        )
+        self.top_title.bind(size=lambda i, s: setattr(i, 'text_size', s))
+
+        top.add_widget(back)
+        top.add_widget(self.top_title)
+        self.add_widget(top)
+
+        self.scroll = ScrollView(size_hint=(1, 1), do_scroll_x=False)
+        body = BoxLayout(
+            orientation='vertical', size_hint_y=None,
+            padding=dp(14), spacing=dp(10),
+        )
+        body.bind(minimum_height=body.setter('height'), width=self._wrap)
+
+        self.poster = PosterImage(
+            size_hint=(1, None), height=dp(380),
+            allow_stretch=True, keep_ratio=True,
+        )
+        body.add_widget(self.poster)
+
+        self.title_lbl = self._label('22sp', TEXT_PRIMARY, bold=True, height=dp(36))
+        self.stars_lbl = self._label('16sp', GOLD, height=dp(28))
+        self.meta_lbl = self._label('13sp', TEXT_MUTED, height=dp(22))
+        for lbl in (self.title_lbl, self.stars_lbl, self.meta_lbl):
+            body.add_widget(lbl)
+
+        sep = Widget(size_hint_y=None, height=dp(1))
+        with sep.canvas:
+            Color(*SURFACE_COLOR)
+            sep._r = Rectangle(pos=sep.pos, size=sep.size)
+        sep.bind(
+            pos=lambda i, v: setattr(i._r, 'pos', v),
+            size=lambda i, v: setattr(i._r, 'size', v),
+        )
+        body.add_widget(sep)
+
+        overview_hdr = self._label('16sp', TEXT_PRIMARY, bold=True, height=dp(28))
+        overview_hdr.text = 'Overview'
+        body.add_widget(overview_hdr)
+
+        self.overview_lbl = Label(
+            font_size='14sp', color=(0.78, 0.78, 0.84, 1), size_hint_y=None,
+            halign='left', valign='top',
+        )
+        self.overview_lbl.bind(texture_size=self.overview_lbl.setter('size'))
+        self._wrapped.append(self.overview_lbl)
+        body.add_widget(self.overview_lbl)
+
+        self.similar_hdr = self._label('16sp', TEXT_PRIMARY, bold=True, height=dp(28))
+        body.add_widget(self.similar_hdr)
+        self.similar_scroll = ScrollView(
+            size_hint_y=None, height=dp(215), do_scroll_y=False,
+            bar_width=dp(2), bar_color=(*ACCENT[:3], 0.4),
+        )
+        self.similar_row = BoxLayout(size_hint=(None, 1), spacing=dp(8))
+        self.similar_row.bind(minimum_width=self.similar_row.setter('width'))
+        self.similar_scroll.add_widget(self.similar_row)
+        body.add_widget(self.similar_scroll)
+        self.similar_cards = [
+            MovieCard(size_hint=(None, None), width=dp(110), height=dp(215))
+            for _ in range(similar_count)
+        ]
+
+        body.add_widget(Widget(size_hint_y=None, height=dp(30)))
+        self.scroll.add_widget(body)
+        self.add_widget(self.scroll)
+
+    def _label(self, size, color, bold=False, height=dp(30)):
+        lbl = Label(
+            font_size=size, color=color, bold=bold,
+            size_hint_y=None, height=height, halign='left',
+        )
+        lbl.base_height = height
+        self._wrapped.append(lbl)
+        return lbl
+
+    def _wrap(self, body, width):
+        for lbl in self._wrapped:
+            lbl.text_size = (max(0, width - dp(28)), None)
+
+    def _show(self, widget, visible):
+        widget.height = widget.base_height if visible else 0
+        widget.opacity = 1 if visible else 0
+
+    def bind_movie(self, movie, similar):
+        self.movie = movie
+        self.top_title.text = movie.title
+        self.title_lbl.text = movie.title
+
+        stars = star_text(movie.vote_average)
+        score = f"{movie.vote_average:.1f}/10" if movie.vote_average else 'N/A'
+        self.stars_lbl.text = f"{stars}  {score}"
+
+        meta = ' | '.join(m for m in (movie.year, movie.genre_text) if m)
+        self.meta_lbl.text = meta
+        self._show(self.meta_lbl, bool(meta))
+
+        self.overview_lbl.text = movie.overview or ''
+
+        self.poster.opacity = 1 if movie.poster_path else 0
+        self.poster.height = dp(380) if movie.poster_path else 0
+        self._poster_started = time.perf_counter_ns()
+        local = poster_store.get(movie.poster_path, 'w500', self._poster_ready)
+        # Until the full-size poster arrives, stretch the grid thumbnail so
+        # the slot is never blank.
+        self.poster.source = local or poster_store.peek(movie.poster_path, 'thumb') or ''
+
+        self.similar_row.clear_widgets()
+        for card, m in zip(self.similar_cards, similar):
+            card.bind_movie(m)
+            self.similar_row.add_widget(card)
+        self.similar_hdr.text = 'More like this' if similar else ''
+        self._show(self.similar_hdr, bool(similar))
+        self.similar_scroll.height = dp(215) if similar else 0
+        self.similar_scroll.scroll_x = 0
+        self.scroll.scroll_y = 1
+
+    @mainthread
+    def _poster_ready(self, poster_path, path):
+        if self.movie is None or poster_path != self.movie.poster_path:
+            return
+        tracer.record('poster_load', self._poster_started, variant='w500', ok=bool(path))
+        if path:
+            self.poster.source = path
+
+
 class MoviePosterApp(App):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.movie_cache: Dict[int, MovieDetails] = {}
+        self.movie_cache = MovieStore(MOVIE_STORE_MAX_BYTES)
+        self.recommender = None
+        self.search_index = SearchIndex()
+        self.facets = FacetIndex(GENRES)
+        self.fuzzy = None
+        self._index_lock = threading.Lock()
+        self.startup = {}
+        self._stopped = False
+        self.detail = None
+        self._hovered = None
+        self.grid_ids = set()
         self.loading_popup = None
         self.error_label = None
         self.grid = None
         self.search_bar = None
         self.title_label = None
         self.cat_bar = None
+        self.filter_bar = None
+        self.feed = None
+        self._warm = None
         self.current_cat = 'Popular'
+        self.load_gen = 0
+        self.card_queue = CardQueue(self._add_card)
+        self.data = DataLoop(PAGE_WORKERS)
 
     def build(self):
+        self._mark_startup('imports')
         Window.clearcolor = BG_COLOR
+        poster_store.thumb_width = int(Window.width / GRID_COLS)
 
         sm = ScreenManager(transition=SlideTransition())
         self.sm = sm
@@ -305,7 +815,7 @@ class MoviePosterApp(App):
         title_bar.add_widget(self.title_label)
         root.add_widget(title_bar)
 
-        self.search_bar = SearchBar()
+        self.search_bar = SearchBar(live=LIVE_SEARCH, debounce=SEARCH_DEBOUNCE_MS / 1000.0)
         self.search_bar.bind(on_search=self._on_search)
         root.add_widget(self.search_bar)
 
@@ -313,123 +823,467 @@ class MoviePosterApp(App):
         self.cat_bar.bind(on_category=self._on_category)
         root.add_widget(self.cat_bar)
 
+        self.filter_bar = FilterBar(GENRES)
+        self.filter_bar.bind(on_filter=self._on_filter)
+        root.add_widget(self.filter_bar)
+        self._facet_trigger = Clock.create_trigger(self._refresh_facets, 0.1)
+
         self.error_label = Label(
             text='', color=ERROR_COLOR, size_hint_y=None,
             height=dp(0), font_size='13sp',
         )
         root.add_widget(self.error_label)
 
-        scroll = ScrollView(
-            size_hint=(1, 1), do_scroll_x=False,
-            bar_width=dp(3), bar_color=(*ACCENT[:3], 0.4),
-        )
-        self.grid = GridLayout(
-            cols=3, spacing=dp(5), padding=dp(3), size_hint_y=None,
-        )
-        self.grid.bind(minimum_height=self.grid.setter('height'))
-        scroll.add_widget(self.grid)
-        root.add_widget(scroll)
+        self.grid = PosterGrid(size_hint=(1, 1))
+        root.add_widget(self.grid)
+        if INFINITE_SCROLL:
+            self._feed_trigger = Clock.create_trigger(self._check_feed)
+            self.grid.bind(scroll_y=self._feed_trigger, height=self._feed_trigger)
+            self.grid.layout.bind(height=self._feed_trigger)
 
         self.main_scr.add_widget(root)
         sm.add_widget(self.main_scr)
         sm.add_widget(self.detail_scr)
+        self._mark_startup('build')
 
-        if not api_key:
+        Window.bind(on_flip=self._first_paint)
+        if PREFETCH_LIMIT > 0:
+            Window.bind(mouse_pos=self._on_mouse_pos)
+
+        if not api_key and not HAVE_CATALOG:
             self._show_error("TMDB_API_KEY missing. Add it to .env in the project folder.")
             return sm
 
-        self._show_loading()
-        threading.Thread(target=self._load_cat, args=('Popular',), daemon=True).start()
+        gen = self._start_load()
+        if not self._restore_snapshot(gen):
+            self._show_loading()
+            self.data.submit(self._load_cat('Popular', gen), key='grid')
+        if WARM_START:
+            Clock.schedule_interval(self._save_snapshot, SNAPSHOT_INTERVAL)
+        if HAVE_CATALOG:
+            self.data.submit(self.data.call(self._index_catalog_titles))
         return sm
 
+    def _mark_startup(self, phase):
+        if phase in self.startup:
+            return
+        now = time.perf_counter_ns()
+        self.startup[phase] = (now - _STARTUP_T0) / 1e6
+        tracer.record(f'startup.{phase}', _STARTUP_T0, now)
+        if phase == 'first_card':
+            logging.info("Startup: " + ', '.join(f"{k} {v:.0f} ms" for k, v in self.startup.items()))
+            if STARTUP_PROFILE:
+                Clock.schedule_once(lambda dt: self.stop(), 0)
+
+    def _first_paint(self, *a):
+        Window.unbind(on_flip=self._first_paint)
+        self._mark_startup('first_paint')
+
+    def _indexes(self):
+        if self.recommender is None:
+            with self._index_lock:
+                if self.recommender is None:
+                    from fuzzy import FuzzyTitleIndex
+                    from recommender import Recommender
+                    self.fuzzy = FuzzyTitleIndex()
+                    self.recommender = Recommender(list(GENRES))
+        return self.recommender, self.fuzzy
+
+    def _index_catalog_titles(self):
+        cat = get_catalog()
+        if cat is None:
+            return
+        _, fuzzy = self._indexes()
+        for mid, title in cat.titles('popular', FUZZY_CATALOG_TITLES):
+            fuzzy.add(mid, title)
+
     def _on_category(self, inst, cat):
         self.current_cat = cat
         self.title_label.text = f'{cat} Movies'
         self._clear_error()
         self._clear_grid()
         self._show_loading()
-        threading.Thread(target=self._load_cat, args=(cat,), daemon=True).start()
+        gen = self._start_load()
+        self.data.submit(self._load_cat(cat, gen), key='grid')
 
     def _on_search(self, *a):
         q = self.search_bar.search_text.strip()
         self._clear_error()
         self._clear_grid()
+        gen = self._start_load()
 
         if not q:
             cat = self.cat_bar.active
             self.title_label.text = f'{cat} Movies'
             self._show_loading()
-            threading.Thread(target=self._load_cat, args=(cat,), daemon=True).start()
+            self.data.submit(self._load_cat(cat, gen), key='grid')
             return
 
         self.title_label.text = f'Search: {q}'
-        self._show_loading()
-        threading.Thread(target=self._do_search, args=(q,), daemon=True).start()
-
-    def _cat_func(self, cat):
-        m = Movie()
-        if cat == 'Top Rated':
-            return m.top_rated
-        if cat == 'Now Playing':
-            return m.now_playing
-        return m.popular
-
-    def _load_cat(self, cat):
+        local = self._local_search(q)
+        if local:
+            self.card_queue.push(local, gen)
+        elif not self.search_bar.live:
+            self._show_loading()
+        self.data.submit(self._do_search(q, gen, bool(local)), key='grid')
+
+    def _local_search(self, query):
+        hits = self.search_index.search(query, limit=LOCAL_SEARCH_LIMIT)
+        return [m for m in (self.movie_cache.get(mid) for mid, _ in hits) if m]
+
+    def _start_load(self):
+        self.load_gen += 1
+        self.card_queue.clear(self.load_gen)
+        poster_textures.begin_results()
+        self.grid_ids = set()
+        self.facets.clear()
+        self.feed = None
+        self.data.cancel('feed')
+        return self.load_gen
+
+    def _is_stale(self, gen):
+        return self.load_gen != gen
+
+    def _cat_endpoint(self, cat):
+        return CATEGORY_ENDPOINTS.get(cat, 'popular')
+
+    async def _cat_fetch(self, cat):
+        name = CATALOG_LISTS.get(cat)
+        offline = await self.data.call(get_catalog) if name else None
+        if offline is not None:
+            return partial(catalog_page, offline, name)
+        return partial(fetch_movies, self._cat_endpoint(cat), None)
+
+    async def _load_cat(self, cat, gen):
+        stale = lambda: self._is_stale(gen)
         try:
-            func = self._cat_func(cat)
-            first = fetch_movies(func, page_number=1)
-            if not first:
-                self._show_error("Could not load movies. Check your connection.")
-                self._hide_loading()
-                return
-            for mv in first:
-                self.movie_cache[mv.id] = mv
-                self._add_card(mv)
-            self._hide_loading()
-
-            for p in range(2, 4):
-                if self.current_cat != cat:
+            fetch = await self._cat_fetch(cat)
+            async with aclosing(self.data.pages(fetch, INITIAL_PAGES)) as source:
+                pages = tracer.aiter_spans(source, 'load_cat.page', cat=cat)
+                first = await anext(pages)
+                if stale():
                     return
-                more = fetch_movies(func, page_number=p)
-                if more:
-                    for mv in more:
-                        self.movie_cache[mv.id] = mv
-                        self._add_card(mv)
+                if not first:
+                    self._show_error("Could not load movies. Check your connection.")
+                    self._hide_loading()
+                    return
+                self._hide_loading()
+                await self._add_cards(first, gen)
+
+                loaded = [first]
+                async for more in pages:
+                    if stale():
+                        return
+                    loaded.append(more or [])
+                    if more:
+                        await self._add_cards(more, gen)
+            if INFINITE_SCROLL:
+                self._start_feed(fetch, gen, loaded)
         except Exception as e:
             logging.error(f"Load error: {e}")
             self._show_error(str(e))
             self._hide_loading()
 
-    def _do_search(self, query):
+    async def _do_search(self, query, gen, have_local=False, corrected=False):
+        stale = lambda: self._is_stale(gen)
         try:
-            first = fetch_movies(Movie().search, query, 1)
-            if not first:
-                self._show_error("No movies found.")
+            fetch = partial(fetch_movies, 'search', query)
+            async with aclosing(self.data.pages(fetch, INITIAL_PAGES)) as source:
+                pages = tracer.aiter_spans(source, 'search.page', corrected=corrected)
+                first = await anext(pages)
+                if stale():
+                    return
+                if not first:
+                    if not corrected:
+                        await source.aclose()
+                        await self._fuzzy_fallback(query, gen, have_local)
+                        return
+                    if not have_local:
+                        self._show_error("No movies found.")
+                    self._hide_loading()
+                    return
                 self._hide_loading()
-                return
-            for mv in first:
-                self.movie_cache[mv.id] = mv
-                self._add_card(mv)
-            self._hide_loading()
-
-            for p in range(2, 4):
-                more = fetch_movies(Movie().search, query, p)
-                if more:
-                    for mv in more:
-                        self.movie_cache[mv.id] = mv
-                        self._add_card(mv)
+                await self._add_cards(first, gen)
+
+                loaded = [first]
+                async for more in pages:
+                    if stale():
+                        return
+                    loaded.append(more or [])
+                    if more:
+                        await self._add_cards(more, gen)
+            if INFINITE_SCROLL:
+                self._start_feed(fetch, gen, loaded)
         except Exception as e:
             logging.error(f"Search error: {e}")
             self._show_error(str(e))
             self._hide_loading()
 
     @mainthread
+    def _start_feed(self, fetch, gen, pages, first=1):
+        if not self._is_stale(gen):
+            self.feed = PageFeed(fetch, gen, pages, first=first)
+            self._feed_trigger()
+
+    def _restore_snapshot(self, gen):
+        # Paints the last session's grid straight from disk; the network only
+        # decides what changes once the background refresh lands.
+        warm = snapshot.load(SNAPSHOT_PATH) if WARM_START else None
+        if not warm or not warm[1] or warm[0].get('category') not in CATEGORY_ENDPOINTS:
+            return False
+        state, movies = warm
+        cat = state['category']
+        with tracer.span('snapshot.restore', movies=len(movies)):
+            self.current_cat = cat
+            self.cat_bar.select(cat)
+            self.title_label.text = f'{cat} Movies'
+            for mv in movies:
+                self.movie_cache.put(mv)
+            self.card_queue.push(movies, gen)
+            self.grid.scroll_to_offset(state.get('scroll', 0))
+        self._warm = (state, movies, gen)
+        self.data.submit(self.data.call(self._index_movies, movies))
+        self.data.submit(self._refresh_snapshot(state, gen), key='grid')
+        return True
+
+    async def _refresh_snapshot(self, state, gen):
+        cat = state['category']
+        first, count = state.get('first_page', 1), state.get('pages', INITIAL_PAGES)
+        try:
+            fetch = await self._cat_fetch(cat)
+            async with aclosing(self.data.pages(fetch, count, first=first)) as source:
+                loaded = [p or [] async for p in tracer.aiter_spans(source, 'snapshot.page', cat=cat)]
+        except Exception as e:
+            logging.error(f"Refresh error: {e}")
+            return
+        if self._is_stale(gen) or not any(loaded):
+            return
+        movies = [mv for page in loaded for mv in page]
+        for mv in movies:
+            self.movie_cache.put(mv)
+        self._apply_refresh(movies, gen)
+        await self.data.call(self._index_movies, movies)
+        if INFINITE_SCROLL:
+            self._start_feed(fetch, gen, loaded, first)
+
+    @mainthread
+    def _apply_refresh(self, movies, gen):
+        if self._is_stale(gen):
+            return
+        self._warm = None
+        with tracer.span('snapshot.diff', movies=len(movies)) as span:
+            # Any snapshot cards still queued are superseded by the fresh list.
+            self.card_queue.clear(gen)
+            old = {d['movie'].id: d['movie'] for d in self.grid.data}
+            self.grid_ids = set()
+            self.facets.clear()
+            for mv in movies:
+                if mv.poster_path and mv.id not in self.grid_ids:
+                    self.grid_ids.add(mv.id)
+                    self.facets.add(mv)
+            shown = self.facets.movies
+            if self.filter_bar.active:
+                shown = self.facets.movies_in(self.facets.select(**self.filter_bar.selected))
+            data = self.grid.data
+            changed = [i for i, mv in enumerate(shown) if i < len(data) and not _same_movie(data[i]['movie'], mv)]
+            span.args['added'] = len(self.grid_ids - old.keys())
+            span.args['removed'] = len(old.keys() - self.grid_ids)
+            if len(shown) == len(data) and all(data[i]['movie'].id == shown[i].id for i in changed):
+                # Same cards in the same slots: only rebind the ones whose
+                # details moved, so the rest of the grid is left alone.
+                for i in changed:
+                    data[i] = {'movie': shown[i]}
+                span.args['changed'] = len(changed)
+            else:
+                self.grid.data = [{'movie': mv} for mv in shown]
+                span.args['changed'] = len(shown)
+        self._facet_trigger()
+        if shown and 'first_card' not in self.startup:
+            self._mark_startup('first_card')
+
+    def _snapshot_state(self):
+        if self.grid is None or self.search_bar.search_text.strip():
+            return None
+        scroll = 0 if self.filter_bar.active else self.grid.distance_to_start()
+        if self._warm is not None and self._warm[2] == self.load_gen:
+            state, movies, _ = self._warm
+            return dict(state, scroll=scroll), movies
+        feed = self.feed
+        if feed is not None:
+            movies = [mv for page in feed.pages.values() for mv in page]
+            first, count = feed.first, len(feed.pages)
+        else:
+            movies, first, count = list(self.facets.movies), 1, INITIAL_PAGES
+        if not movies:
+            return None
+        state = {'category': self.current_cat, 'scroll': scroll, 'first_page': first, 'pages': count}
+        return state, movies
+
+    def _save_snapshot(self, *a):
+        state = self._snapshot_state()
+        if state is not None:
+            self.data.submit(self.data.call(self._write_snapshot, *state))
+
+    def _write_snapshot(self, state, movies):
+        try:
+            with tracer.span('snapshot.save', movies=len(movies)):
+                snapshot.save(SNAPSHOT_PATH, state, movies)
+        except OSError as e:
+            logging.error(f"Snapshot save error: {e}")
+
+    def _check_feed(self, *a):
+        feed = self.feed
+        if feed is None or feed.busy or self.grid is None:
+            return
+        grid = self.grid
+        # Fetch while the edge is still a lookahead away, widened by how far
+        # the current scroll speed will carry the view before the page lands.
+        reach = grid.height * SCROLL_LOOKAHEAD
+        if not feed.exhausted and grid.distance_to_end() < reach + max(0.0, grid.velocity) * feed.latency:
+            page = feed.last + 1
+        elif feed.first > 1 and grid.distance_to_start() < reach + max(0.0, -grid.velocity) * feed.latency:
+            page = feed.first - 1
+        else:
+            return
+        feed.busy = True
+        self.data.submit(self._feed_page(feed, page), key='feed')
+
+    async def _feed_page(self, feed, page):
+        start = time.perf_counter()
+        try:
+            with tracer.span('feed.page', page=page):
+                movies = await self.data.blocking(feed.fetch, page)
+        except Exception as e:
+            logging.error(f"Page {page} error: {e}")
+            movies = None
+        feed.latency = 0.7 * feed.latency + 0.3 * (time.perf_counter() - start)
+        if movies and not self._is_stale(feed.gen):
+            # Earlier pages are prepended by _feed_arrived rather than queued.
+            await self._add_cards(movies, feed.gen, queue=page > feed.last)
+        self._feed_arrived(feed, page, movies)
+
+    @mainthread
+    def _feed_arrived(self, feed, page, movies):
+        feed.busy = False
+        if feed is not self.feed or movies is None:
+            return
+        if not movies:
+            if page > feed.last:
+                feed.exhausted = True
+            return
+        feed.pages[page] = movies
+        if page < feed.first:
+            feed.pages.move_to_end(page, last=False)
+            self._reset_facets(feed)
+            self._prepend_cards(movies)
+            if len(feed.pages) > MAX_LOADED_PAGES:
+                self._drop_page(feed, top=False)
+        elif len(feed.pages) > MAX_LOADED_PAGES:
+            self._drop_page(feed, top=True)
+        self._feed_trigger()
+
+    def _reset_facets(self, feed):
+        self.facets.clear()
+        for movies in feed.pages.values():
+            for mv in movies:
+                if mv.poster_path:
+                    self.facets.add(mv)
+
+    def _prepend_cards(self, movies):
+        fresh = [m for m in movies if m.poster_path and m.id not in self.grid_ids]
+        self.grid_ids.update(m.id for m in fresh)
+        selected = self.filter_bar.selected
+        if self.filter_bar.active:
+            fresh = [m for m in fresh if self.facets.accepts(m, **selected)]
+        data = [{'movie': m} for m in fresh] + self.grid.data
+        self.grid.shift_rows(len(data))
+        self.grid.data = data
+        self._facet_trigger()
+
+    def _drop_page(self, feed, top):
+        # Keeps at most MAX_LOADED_PAGES in the grid; a page dropped at one
+        # end is fetched again if the user scrolls back to it.
+        _, movies = feed.pages.popitem(last=not top)
+        ids = {m.id for m in movies}
+        data = self.grid.data
+        if top:
+            # Only whole rows go, so the cards below keep their columns; the
+            # last few cards of the page ride along with the next one.
+            shown = [d['movie'] for d in data if d['movie'].id in ids]
+            carry = shown[len(shown) - len(shown) % self.grid.layout.cols:]
+            ids -= {m.id for m in carry}
+            feed.pages[feed.first] = carry + feed.pages[feed.first]
+        else:
+            feed.exhausted = False
+        self.grid_ids -= ids
+        keep = [d for d in data if d['movie'].id not in ids]
+        if top:
+            self.grid.shift_rows(len(keep))
+        self.grid.data = keep
+        self._reset_facets(feed)
+        self._facet_trigger()
+
+    async def _fuzzy_fallback(self, query, gen, have_local):
+        _, fuzzy = await self.data.call(self._indexes)
+        matches = await self.data.call(fuzzy.match, query, LOCAL_SEARCH_LIMIT)
+        approx = [
+            m for m in (self.movie_cache.get(mid) for _, _, ids in matches for mid in ids) if m
+        ]
+        if approx:
+            self.card_queue.push(approx, gen)
+            have_local = True
+        suggestion = matches[0][0] if matches and matches[0][1] else None
+        if suggestion:
+            self._set_title(f'Search: {suggestion}')
+            await self._do_search(suggestion, gen, have_local, corrected=True)
+            return
+        if not have_local:
+            self._show_error("No movies found.")
+        self._hide_loading()
+
+    @mainthread
+    def _set_title(self, text):
+        if self.title_label:
+            self.title_label.text = text
+
+    async def _add_cards(self, movies, gen, queue=True):
+        for mv in movies:
+            self.movie_cache.put(mv)
+        # Cards only need the movie store, so queue them before indexing; the
+        # indexes build on a worker to keep the loop free for other loads.
+        if queue:
+            self.card_queue.push(movies, gen)
+        await self.data.call(self._index_movies, movies)
+
+    def _index_movies(self, movies):
+        recommender, fuzzy = self._indexes()
+        recommender.add(movies)
+        self.search_index.add(movies)
+        fuzzy.add_movies(movies)
+
     def _add_card(self, movie):
-        if not self.grid or not movie.poster_path:
+        if not self.grid or not movie.poster_path or movie.id in self.grid_ids:
             return
-        card = MovieCard(movie)
-        card.bind(on_release=self._open_detail)
-        self.grid.add_widget(card)
+        start = time.perf_counter_ns()
+        self.grid_ids.add(movie.id)
+        self.facets.add(movie)
+        self._facet_trigger()
+        if not self.filter_bar.active or self.facets.accepts(movie, **self.filter_bar.selected):
+            self.grid.data.append({'movie': movie})
+        tracer.record('add_card', start)
+        if 'first_card' not in self.startup:
+            self._mark_startup('first_card')
+
+    def _on_filter(self, inst, selected):
+        with tracer.span('filter', loaded=len(self.facets)) as span:
+            movies = self.facets.movies_in(self.facets.select(**selected))
+            span.args['shown'] = len(movies)
+            self.grid.data = [{'movie': m} for m in movies]
+            self.grid.scroll_y = 1
+        self._refresh_facets()
+
+    def _refresh_facets(self, *a):
+        self.filter_bar.set_counts(self.facets.counts(**self.filter_bar.selected))
 
     @mainthread
     def _show_error(self, msg):
@@ -446,10 +1300,12 @@ class MoviePosterApp(App):
     @mainthread
     def _clear_grid(self):
         if self.grid:
-            self.grid.clear_widgets()
+            self.grid.data = []
 
     @mainthread
     def _show_loading(self):
+        if self.loading_popup and self.loading_popup.parent:
+            return
         self.loading_popup = Popup(
             title='', separator_height=0,
             content=Label(text='Loading...', color=TEXT_PRIMARY, font_size='15sp'),
@@ -468,121 +1324,95 @@ class MoviePosterApp(App):
         mid = getattr(inst, 'movie_id', None)
         if mid is None:
             return
+        with tracer.span('open_detail', movie=mid) as span:
+            self._build_detail(inst, mid, span)
+
+    def _build_detail(self, inst, mid, span):
         movie = self.movie_cache.get(mid)
         if not movie:
-            return
-
-        self.detail_scr.clear_widgets()
-
-        page = BoxLayout(orientation='vertical')
-        with page.canvas.before:
-            Color(*BG_COLOR)
-            page._bg = Rectangle(pos=page.pos, size=page.size)
-        page.bind(
-            pos=lambda i, v: setattr(i._bg, 'pos', v),
-            size=lambda i, v: setattr(i._bg, 'size', v),
-        )
-
-        top = BoxLayout(size_hint_y=None, height=dp(48), padding=[dp(6), dp(4)], spacing=dp(6))
-        with top.canvas.before:
-            Color(*CARD_COLOR)
-            top._bg = Rectangle(pos=top.pos, size=top.size)
-        top.bind(
-            pos=lambda i, v: setattr(i._bg, 'pos', v),
-            size=lambda i, v: setattr(i._bg, 'size', v),
-        )
-
-        back = Button(
-            text='← Back', size_hint_x=0.22,
-            background_normal='', background_color=ACCENT,
-            color=TEXT_PRIMARY, font_size='13sp', bold=True,
-        )
-        back.bind(on_release=self._go_back)
-
-        ttl = Label(
-            text=movie.title, font_size='15sp', bold=True,
-            color=TEXT_PRIMARY, shorten=True, shorten_from='right',
-            halign='center', size_hint_x=0.78,
-        )
-        ttl.bind(size=lambda i, s: setattr(i, 'text_size', s))
-
-        top.add_widget(back)
-        top.add_widget(ttl)
-        page.add_widget(top)
-
-        scroll = ScrollView(size_hint=(1, 1), do_scroll_x=False)
-        body = BoxLayout(
-            orientation='vertical', size_hint_y=None,
-            padding=dp(14), spacing=dp(10),
-        )
-        body.bind(minimum_height=body.setter('height'))
-
-        if movie.poster_path:
-            body.add_widget(AsyncImage(
-                source=f"https://image.tmdb.org/t/p/w500/{movie.poster_path}",
-                size_hint=(1, None), height=dp(380),
-                allow_stretch=True, keep_ratio=True,
-            ))
-
-        body.add_widget(self._label(
-            movie.title, '22sp', TEXT_PRIMARY, bold=True, height=dp(36),
-        ))
-
-        stars = star_text(movie.vote_average)
-        score = f"{movie.vote_average:.1f}/10" if movie.vote_average else 'N/A'
-        body.add_widget(self._label(f"{stars}  {score}", '16sp', GOLD, height=dp(28)))
-
-        meta = []
-        if movie.year:
-            meta.append(movie.year)
-        if movie.genre_text:
-            meta.append(movie.genre_text)
-        if meta:
-            body.add_widget(self._label(' | '.join(meta), '13sp', TEXT_MUTED, height=dp(22)))
-
-        sep = Widget(size_hint_y=None, height=dp(1))
-        with sep.canvas:
-            Color(*SURFACE_COLOR)
-            sep._r = Rectangle(pos=sep.pos, size=sep.size)
-        sep.bind(
-            pos=lambda i, v: setattr(i._r, 'pos', v),
-            size=lambda i, v: setattr(i._r, 'size', v),
-        )
-        body.add_widget(sep)
-
-        body.add_widget(self._label('Overview', '16sp', TEXT_PRIMARY, bold=True, height=dp(28)))
-
-        if movie.overview:
-            ov = Label(
-                text=movie.overview, font_size='14sp',
-                color=(0.78, 0.78, 0.84, 1), size_hint_y=None,
-                halign='left', valign='top',
-                text_size=(Window.width - dp(34), None),
-            )
-            ov.bind(texture_size=ov.setter('size'))
-            body.add_widget(ov)
+            movie = getattr(inst, 'movie', None)
+            if not movie:
+                span.args['fetched'] = True
+                self.data.submit(self._fetch_detail(mid), key='detail')
+                return
+            self.movie_cache.put(movie)
+        self._present_detail(movie, span)
 
-        body.add_widget(Widget(size_hint_y=None, height=dp(30)))
+    async def _fetch_detail(self, mid):
+        try:
+            movie = await self.data.blocking(fetch_movie, mid)
+        except KeyError:
+            movie = None
+        if movie is None:
+            self._show_error("Could not load movie details.")
+            return
+        self.movie_cache.put(movie)
+        self._detail_fetched(movie)
 
-        scroll.add_widget(body)
-        page.add_widget(scroll)
+    @mainthread
+    def _detail_fetched(self, movie):
+        with tracer.span('open_detail', movie=movie.id, fetched=True) as span:
+            self._present_detail(movie, span)
+
+    def _present_detail(self, movie, span):
+        if self.detail is None:
+            self.detail = DetailView(on_back=self._go_back)
+            self.detail_scr.add_widget(self.detail)
+        if self.detail.movie is not None and self.detail.movie.id == movie.id:
+            span.args['reused'] = True
+        else:
+            self.detail.bind_movie(movie, self._similar(movie))
 
-        self.detail_scr.add_widget(page)
         self.sm.transition.direction = 'left'
         self.sm.current = 'Detail'
 
-    def _label(self, text, size, color, bold=False, height=dp(30)):
-        lbl = Label(
-            text=text, font_size=size, color=color, bold=bold,
-            size_hint_y=None, height=height,
-            halign='left', text_size=(Window.width - dp(34), None),
-        )
-        return lbl
+    def _similar(self, movie, limit=10):
+        if self.recommender is None:
+            return []
+        return [
+            m for m in (self.movie_cache.get(i) for i in self.recommender.similar(movie.id, k=16))
+            if m and m.poster_path
+        ][:limit]
+
+    def _on_mouse_pos(self, win, pos):
+        if self.grid is None or self.sm.current != 'Main':
+            return
+        card = self.grid.card_at(pos)
+        if card is not None and card.poster_path != self._hovered:
+            self._hovered = card.poster_path
+            poster_store.prefetch(card.poster_path, 'w500')
 
     def _go_back(self, *a):
         self.sm.transition.direction = 'right'
         self.sm.current = 'Main'
 
+    def on_stop(self):
+        if self._stopped:
+            return
+        self._stopped = True
+        if WARM_START:
+            state = self._snapshot_state()
+            if state is not None:
+                self._write_snapshot(*state)
+        self.data.stop()
+        if poster_decoder is not None:
+            poster_decoder.close()
+        if not tracer.enabled:
+            return
+        logging.info(f"Data loop: {self.data.stats()}")
+        if poster_decoder is not None:
+            logging.info(f"Poster decoder: {poster_decoder.stats()}, textures: {poster_textures.stats()}")
+        logging.info("Span timings:\n" + tracer.summary())
+        stats = client_stats()
+        if stats:
+            logging.info(f"TMDB client: {stats}")
+        if TRACE_FILE:
+            try:
+                tracer.export_chrome(TRACE_FILE)
+                logging.info(f"Wrote trace to {TRACE_FILE}")
+            except OSError as e:
+                logging.error(f"Trace export error: {e}")
+
 
 if __name__ == '__main__':
     MoviePosterApp().run()
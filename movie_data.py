@@ -0,0 +1,212 @@
+import logging
+import os
+import sys
+import threading
+from functools import lru_cache
+
+from dotenv import load_dotenv
+
+from response_cache import ResponseCache
+from tracing import Tracer
+
+_script_dir = os.path.dirname(os.path.abspath(__file__))
+load_dotenv(os.path.join(_script_dir, '.env'))
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s:%(levelname)s:%(message)s')
+
+api_key = os.getenv('TMDB_API_KEY')
+if not api_key:
+    logging.error("TMDB_API_KEY not found in .env file")
+
+TMDB_API_BASE = os.getenv('TMDB_API_BASE') or 'https://api.themoviedb.org/3'
+TMDB_LANGUAGE = os.getenv('TMDB_LANGUAGE', 'en-US')
+TMDB_POOL_SIZE = int(os.getenv('TMDB_POOL_SIZE', 10))
+TMDB_CONNECT_TIMEOUT = float(os.getenv('TMDB_CONNECT_TIMEOUT', 3.05))
+TMDB_READ_TIMEOUT = float(os.getenv('TMDB_READ_TIMEOUT', 10))
+TMDB_RATE_LIMIT = float(os.getenv('TMDB_RATE_LIMIT', 40))
+TMDB_RATE_BURST = int(os.getenv('TMDB_RATE_BURST', 20))
+TMDB_MAX_RETRIES = int(os.getenv('TMDB_MAX_RETRIES', 3))
+
+CACHE_DIR = os.getenv('TMDB_CACHE_DIR') or os.path.join(_script_dir, '.cache')
+
+tmdb_session = None
+if (os.getenv('TMDB_TRANSPORT') or 'live').lower() != 'live':
+    import transport
+    tmdb_session = transport.session_from_env(os.path.join(CACHE_DIR, 'traffic.jsonl.gz'))
+
+tmdb = None
+_tmdb_lock = threading.Lock()
+
+
+def tmdb_client():
+    global tmdb
+    if tmdb is None:
+        with _tmdb_lock:
+            if tmdb is None:
+                from tmdb_api import TMDBClient
+                tmdb = TMDBClient(
+                    api_key or '', base=TMDB_API_BASE, language=TMDB_LANGUAGE,
+                    pool_size=TMDB_POOL_SIZE, timeout=(TMDB_CONNECT_TIMEOUT, TMDB_READ_TIMEOUT),
+                    session=tmdb_session, rate=TMDB_RATE_LIMIT, burst=TMDB_RATE_BURST,
+                    retries=TMDB_MAX_RETRIES,
+                )
+    return tmdb
+
+
+def client_stats():
+    return tmdb.stats() if tmdb is not None else None
+
+
+CACHE_MAX_BYTES = int(os.getenv('TMDB_CACHE_MAX_BYTES', 8 * 1024 * 1024))
+CACHE_TTLS = {
+    'popular': 6 * 3600,
+    'top_rated': 24 * 3600,
+    'now_playing': 3 * 3600,
+    'search': 3600,
+}
+
+response_cache = ResponseCache(
+    os.path.join(CACHE_DIR, 'responses.db'),
+    ttls=CACHE_TTLS, max_bytes=CACHE_MAX_BYTES,
+)
+
+PAGE_COUNT = int(os.getenv('TMDB_PAGE_COUNT', 3))
+PAGE_WORKERS = int(os.getenv('TMDB_PAGE_WORKERS', 3))
+TRACE_ENABLED = os.getenv('TMDB_TRACE', '1') != '0'
+
+tracer = Tracer(enabled=TRACE_ENABLED)
+
+CATALOG_PATH = os.getenv('TMDB_CATALOG') or os.path.join(CACHE_DIR, 'catalog.bin')
+CATALOG_LISTS = {'Popular': 'popular', 'Top Rated': 'top_rated'}
+CATEGORY_ENDPOINTS = {'Popular': 'popular', 'Top Rated': 'top_rated', 'Now Playing': 'now_playing'}
+
+HAVE_CATALOG = os.path.exists(CATALOG_PATH)
+catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog():
+    global catalog, HAVE_CATALOG
+    if catalog is None and HAVE_CATALOG:
+        with _catalog_lock:
+            if catalog is None and HAVE_CATALOG:
+                try:
+                    from catalog import Catalog
+                    catalog = Catalog(CATALOG_PATH)
+                    logging.info(f"Using offline catalog {CATALOG_PATH} ({len(catalog)} movies)")
+                except (OSError, ValueError) as e:
+                    logging.error(f"Catalog error: {e}")
+                    HAVE_CATALOG = False
+    return catalog
+
+
+GENRES = {
+    28: "Action", 12: "Adventure", 16: "Animation", 35: "Comedy",
+    80: "Crime", 99: "Documentary", 18: "Drama", 10751: "Family",
+    14: "Fantasy", 36: "History", 27: "Horror", 10402: "Music",
+    9648: "Mystery", 10749: "Romance", 878: "Sci-Fi", 10770: "TV Movie",
+    53: "Thriller", 10752: "War", 37: "Western",
+}
+
+
+@lru_cache(maxsize=4096)
+def _genre_tuple(genres):
+    return genres
+
+
+class MovieDetails:
+    __slots__ = (
+        'title', 'overview', 'release_date', 'poster_path', 'id',
+        'vote_average', 'genre_ids',
+    )
+
+    def __init__(self, title, overview, release_date, poster_path, movie_id,
+                 vote_average=0, genre_ids=None):
+        self.title = sys.intern(title or '')
+        self.overview = overview or ''
+        self.release_date = sys.intern(release_date or '')
+        self.poster_path = poster_path
+        self.id = movie_id
+        self.vote_average = float(vote_average or 0)
+        self.genre_ids = _genre_tuple(tuple(genre_ids or ()))
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(
+            title=d.get('title', ''),
+            overview=d.get('overview', ''),
+            release_date=d.get('release_date', ''),
+            poster_path=d.get('poster_path', ''),
+            movie_id=d['id'],
+            vote_average=d.get('vote_average', 0),
+            genre_ids=d.get('genre_ids') or [g['id'] for g in d.get('genres') or ()],
+        )
+
+    def to_dict(self):
+        return {
+            'title': self.title,
+            'overview': self.overview,
+            'release_date': self.release_date,
+            'poster_path': self.poster_path,
+            'id': self.id,
+            'vote_average': self.vote_average,
+            'genre_ids': list(self.genre_ids),
+        }
+
+    @property
+    def year(self):
+        return self.release_date[:4] if self.release_date else ''
+
+    @property
+    def genre_text(self):
+        names = [GENRES.get(g, '') for g in self.genre_ids[:3]]
+        return ' • '.join(n for n in names if n)
+
+
+def fetch_movies(endpoint, query=None, page_number=1):
+    with tracer.span('fetch_movies', endpoint=endpoint, page=page_number) as span:
+        cached = response_cache.get(endpoint, query, page_number)
+        if cached:
+            span.args['cached'] = True
+            with tracer.span('fetch_movies.decode', rows=len(cached)):
+                return [MovieDetails.from_dict(d) for d in cached]
+        stale = response_cache.stale(endpoint, query, page_number)
+        try:
+            with tracer.span('fetch_movies.request', endpoint=endpoint, page=page_number):
+                data, etag = tmdb_client().movie_list(
+                    endpoint, page_number, query, etag=stale[1] if stale else None,
+                )
+            if data is None:
+                if not stale:
+                    return None
+                span.args['revalidated'] = True
+                response_cache.refresh(endpoint, query, page_number)
+                return [MovieDetails.from_dict(d) for d in stale[0]]
+            results = data.get('results') or []
+            if not results:
+                return []
+            with tracer.span('fetch_movies.convert', rows=len(results)):
+                out = [MovieDetails.from_dict(m) for m in results]
+            response_cache.put(endpoint, query, page_number, [mv.to_dict() for mv in out], etag)
+            return out
+        except Exception as e:
+            logging.error(f"Fetch error: {e}")
+            return None
+
+
+def fetch_movie(movie_id):
+    # None means TMDB could not be reached; an id TMDB does not know raises
+    # KeyError, like a miss on MovieStore.
+    with tracer.span('fetch_movie', movie=movie_id):
+        try:
+            data, _ = tmdb_client().movie(movie_id)
+            return MovieDetails.from_dict(data) if data else None
+        except Exception as e:
+            if getattr(e, 'status', None) == 404:
+                raise KeyError(movie_id) from None
+            logging.error(f"Fetch error: {e}")
+            return None
+
+
+def catalog_page(cat, name, page_number):
+    return [MovieDetails.from_dict(d) for d in cat.page(name, page_number)]
@@ -0,0 +1,70 @@
+import sys
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+def record_size(movie):
+    size = sys.getsizeof(movie)
+    for name in type(movie).__slots__:
+        value = getattr(movie, name, None)
+        size += sys.getsizeof(value)
+        if isinstance(value, tuple):
+            size += sum(sys.getsizeof(v) for v in value)
+    return size
+
+
+class MovieStore:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._records = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    def put(self, movie):
+        with self._lock:
+            if self._records.pop(movie.id, None) is not None:
+                self.bytes -= self._sizes.pop(movie.id)
+            size = record_size(movie)
+            self._records[movie.id] = movie
+            self._sizes[movie.id] = size
+            self.bytes += size
+            while self.bytes > self.max_bytes and len(self._records) > 1:
+                mid, _ = self._records.popitem(last=False)
+                self.bytes -= self._sizes.pop(mid)
+                self.evictions += 1
+
+    def get(self, movie_id, default=None):
+        with self._lock:
+            movie = self._records.get(movie_id)
+            if movie is None:
+                self.misses += 1
+                return default
+            self._records.move_to_end(movie_id)
+            self.hits += 1
+            return movie
+
+    def __getitem__(self, movie_id):
+        movie = self.get(movie_id)
+        if movie is None:
+            raise KeyError(movie_id)
+        return movie
+
+    def __contains__(self, movie_id):
+        return movie_id in self._records
+
+    def __len__(self):
+        return len(self._records)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._records), 'bytes': self.bytes,
+                'max_bytes': self.max_bytes, 'evictions': self.evictions,
+                'hits': self.hits, 'misses': self.misses,
+            }
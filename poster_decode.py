@@ -0,0 +1,111 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+def decode_poster(path, width, height):
+    with Image.open(path) as img:
+        # JPEG can decode straight to a smaller scale, which skips most of the IDCT work.
+        img.draft('RGB', (width, height))
+        img = img.convert('RGB')
+        scale = min(width / img.width, height / img.height)
+        size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+        if size != img.size:
+            img = img.resize(size, Image.LANCZOS, reducing_gap=2.0)
+        # GL textures start at the bottom row, so flip here rather than on the UI thread.
+        return size, img.transpose(Image.FLIP_TOP_BOTTOM).tobytes()
+
+
+def default_workers():
+    return max(1, min(4, (os.cpu_count() or 2) - 1))
+
+
+class PosterDecoder:
+    def __init__(self, workers=None, processes=True):
+        self.workers = workers or default_workers()
+        self.processes = processes
+        self.decoded = 0
+        self.failed = 0
+        self.coalesced = 0
+        self._pool = None
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def start(self):
+        # Spawned or forkserver workers would re-run the Kivy app as their main
+        # module, so workers are forked, and only while this is the process's
+        # only thread: a child forked from a threaded process can inherit a
+        # lock some other thread was holding. Otherwise decode on threads
+        # (Pillow releases the GIL).
+        with self._lock:
+            if self._pool is not None:
+                return
+            if self.processes and 'fork' in multiprocessing.get_all_start_methods():
+                if threading.active_count() == 1:
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context('fork'),
+                    )
+                    # With fork the first submit launches every worker before
+                    # the executor starts its own manager thread.
+                    self._pool.submit(int)
+                    return
+                logging.info("Threads already running; decoding posters on threads instead of forking")
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='decode')
+
+    def _executor(self):
+        if self._pool is None:
+            self.start()
+        return self._pool
+
+    def submit(self, path, size, callback):
+        key = (path, int(size[0]), int(size[1]))
+        with self._lock:
+            waiters = self._pending.get(key)
+            if waiters is not None:
+                self.coalesced += 1
+                waiters.append(callback)
+                return
+            self._pending[key] = [callback]
+        try:
+            fut = self._executor().submit(decode_poster, *key)
+        except RuntimeError as e:
+            logging.error(f"Poster decode error for {path}: {e}")
+            self._finish(key, None)
+            return
+        fut.add_done_callback(lambda f: self._done(key, f))
+
+    def _done(self, key, fut):
+        try:
+            result = fut.result()
+        except Exception as e:
+            logging.error(f"Poster decode error for {key[0]}: {e}")
+            result = None
+        self._finish(key, result)
+
+    def _finish(self, key, result):
+        with self._lock:
+            if result is None:
+                self.failed += 1
+            else:
+                self.decoded += 1
+            waiters = self._pending.pop(key, [])
+        for cb in waiters:
+            cb(key, result)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'decoded': self.decoded, 'failed': self.failed, 'coalesced': self.coalesced,
+                'pending': len(self._pending), 'workers': self.workers,
+            }
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,203 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+IMAGE_BASE = os.getenv('TMDB_IMAGE_BASE', 'https://image.tmdb.org/t/p')
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_PREFETCH_LIMIT = 12
+
+
+class PosterStore:
+    def __init__(self, root, max_bytes=DEFAULT_MAX_BYTES, workers=4, thumb_width=240, session=None,
+                 prefetch_limit=DEFAULT_PREFETCH_LIMIT):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.thumb_width = thumb_width
+        self.prefetch_limit = prefetch_limit
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+        self._lock = threading.Lock()
+        self._prefetch = OrderedDict()
+        self._prefetch_cv = threading.Condition(self._lock)
+        self._prefetch_thread = None
+        self._files = OrderedDict()
+        self._bytes = 0
+        self._pending = {}
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='poster')
+        self._session = session
+        os.makedirs(root, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        found = []
+        for folder, _, names in os.walk(self.root):
+            for name in names:
+                path = os.path.join(folder, name)
+                if name.endswith('.part'):
+                    os.remove(path)
+                    continue
+                st = os.stat(path)
+                found.append((st.st_mtime, path, st.st_size))
+        for _, path, size in sorted(found):
+            self._files[path] = size
+            self._bytes += size
+
+    def _path(self, poster_path, variant):
+        return os.path.join(self.root, variant, os.path.basename(poster_path))
+
+    def _touch(self, path):
+        with self._lock:
+            if path not in self._files:
+                return False
+            self._files.move_to_end(path)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return True
+
+    def _add(self, path):
+        size = os.path.getsize(path)
+        with self._lock:
+            self._bytes += size - self._files.pop(path, 0)
+            self._files[path] = size
+            while self._bytes > self.max_bytes and len(self._files) > 1:
+                old, old_size = self._files.popitem(last=False)
+                self._bytes -= old_size
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+
+    def _http(self):
+        # requests is imported on the first download, on a poster thread,
+        # so it stays off the startup path.
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+                    self._session = requests.Session()
+        return self._session
+
+    def _download(self, poster_path, size):
+        path = self._path(poster_path, size)
+        if self._touch(path):
+            return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        resp = self._http().get(f"{IMAGE_BASE}/{size}/{poster_path.lstrip('/')}", timeout=15)
+        resp.raise_for_status()
+        tmp = path + '.part'
+        with open(tmp, 'wb') as f:
+            f.write(resp.content)
+        os.replace(tmp, path)
+        self._add(path)
+        return path
+
+    def _make_thumb(self, poster_path):
+        src = self._download(poster_path, 'w342')
+        if Image is None:
+            return src
+        path = self._path(poster_path, f't{self.thumb_width}')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with Image.open(src) as img:
+            height = round(img.height * self.thumb_width / img.width)
+            img.convert('RGB').resize((self.thumb_width, height), Image.LANCZOS).save(
+                path + '.part', 'JPEG', quality=85,
+            )
+        os.replace(path + '.part', path)
+        self._add(path)
+        return path
+
+    def _variant_path(self, poster_path, variant):
+        if variant == 'thumb':
+            if Image is None:
+                return self._path(poster_path, 'w342')
+            return self._path(poster_path, f't{self.thumb_width}')
+        return self._path(poster_path, variant)
+
+    def peek(self, poster_path, variant):
+        if not poster_path:
+            return None
+        path = self._variant_path(poster_path, variant)
+        return path if self._touch(path) else None
+
+    def prefetch(self, poster_path, variant):
+        if not poster_path or self.prefetch_limit <= 0:
+            return
+        key = (poster_path, variant)
+        path = self._variant_path(poster_path, variant)
+        with self._lock:
+            if key in self._pending or path in self._files:
+                return
+            # Newest requests are served first and the oldest are dropped, so
+            # the queue follows whatever the user is looking at now.
+            self._prefetch.pop(key, None)
+            self._prefetch[key] = path
+            while len(self._prefetch) > self.prefetch_limit:
+                self._prefetch.popitem(last=False)
+            if self._prefetch_thread is None:
+                self._prefetch_thread = threading.Thread(
+                    target=self._prefetch_loop, name='poster-prefetch', daemon=True,
+                )
+                self._prefetch_thread.start()
+            self._prefetch_cv.notify()
+
+    def _prefetch_loop(self):
+        while True:
+            with self._prefetch_cv:
+                while not self._prefetch:
+                    self._prefetch_cv.wait()
+                key, path = self._prefetch.popitem(last=True)
+                if key in self._pending or path in self._files:
+                    continue
+                self._pending[key] = []
+                self.prefetched += 1
+            self._fetch(*key)
+
+    def get(self, poster_path, variant, callback):
+        if not poster_path:
+            return None
+        path = self._variant_path(poster_path, variant)
+        if self._touch(path):
+            with self._lock:
+                self.hits += 1
+            return path
+        key = (poster_path, variant)
+        with self._lock:
+            self.misses += 1
+            waiters = self._pending.get(key)
+            if waiters is not None:
+                waiters.append(callback)
+                return None
+            self._pending[key] = [callback]
+        self._pool.submit(self._fetch, poster_path, variant)
+        return None
+
+    def _fetch(self, poster_path, variant):
+        path = None
+        try:
+            if variant == 'thumb':
+                path = self._make_thumb(poster_path)
+            else:
+                path = self._download(poster_path, variant)
+        except Exception as e:
+            logging.error(f"Poster error for {poster_path}: {e}")
+        with self._lock:
+            waiters = self._pending.pop((poster_path, variant), [])
+        for cb in waiters:
+            cb(poster_path, path)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits, 'misses': self.misses, 'prefetched': self.prefetched,
+                'files': len(self._files), 'bytes': self._bytes,
+            }
@@ -0,0 +1,151 @@
+from collections import OrderedDict
+
+from kivy.graphics.texture import Texture
+
+DEFAULT_LIMIT = 180
+DEFAULT_PAGE_SIZE = 2048
+DEFAULT_MAX_PAGES = 6
+
+
+class PosterTextures:
+    def __init__(self, limit=DEFAULT_LIMIT):
+        self.limit = limit
+        self._textures = OrderedDict()
+
+    def get(self, key):
+        tex = self._textures.get(key)
+        if tex is not None:
+            self._textures.move_to_end(key)
+        return tex
+
+    def upload(self, key, size, pixels):
+        tex = self.get(key)
+        if tex is not None:
+            return tex
+        # The decoded rows are already bottom-up RGB at card size, so this is
+        # a single blit with no scaling or conversion on the UI thread.
+        tex = Texture.create(size=size, colorfmt='rgb')
+        tex.blit_buffer(pixels, colorfmt='rgb', bufferfmt='ubyte')
+        self._textures[key] = tex
+        while len(self._textures) > self.limit:
+            self._textures.popitem(last=False)
+        return tex
+
+    def release(self, key, texture):
+        # Each poster has its own texture, so a card keeps drawing the one it
+        # holds even after the cache lets go of it.
+        pass
+
+    def begin_results(self):
+        pass
+
+    def stats(self):
+        return {'textures': len(self._textures)}
+
+
+class PosterAtlas:
+    def __init__(self, page_size=DEFAULT_PAGE_SIZE, max_pages=DEFAULT_MAX_PAGES):
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.generation = 0
+        self.evicted = 0
+        self.pages_dropped = 0
+        self.overflow = 0
+        self._cell = None
+        self._cols = 0
+        self._slots = 0
+        self._pages = []
+        self._free = []
+        # key -> [page, slot, region, generation, refs], least recently used
+        # first. refs counts the cards drawing the region; a cell is only
+        # reused once no card holds it.
+        self._entries = OrderedDict()
+
+    def _reset(self, cell):
+        self._cell = cell
+        size = max(self.page_size, cell[0], cell[1])
+        self._cols = size // cell[0]
+        self._slots = self._cols * (size // cell[1])
+        self._pages = []
+        self._free = []
+        self._entries.clear()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        entry[3] = self.generation
+        entry[4] += 1
+        return entry[2]
+
+    def release(self, key, texture):
+        # An overflow texture or a region from before a reset is not the
+        # entry's region, and must not drop a reference another card holds.
+        entry = self._entries.get(key)
+        if entry is not None and entry[2] is texture and entry[4] > 0:
+            entry[4] -= 1
+
+    def _alloc(self):
+        if self._free:
+            return self._free.pop()
+        if len(self._pages) < self.max_pages:
+            size = max(self.page_size, *self._cell)
+            page = Texture.create(size=(size, size), colorfmt='rgb')
+            self._pages.append(page)
+            self._free = [(page, s) for s in range(self._slots - 1, 0, -1)]
+            return page, 0
+        for key, entry in self._entries.items():
+            if entry[4] == 0:
+                del self._entries[key]
+                self.evicted += 1
+                return entry[0], entry[1]
+        return None
+
+    def upload(self, key, size, pixels):
+        # All grid posters share a cell size, so pages are plain grids of
+        # slots and every card in a page draws from one bound texture.
+        region = self.get(key)
+        if region is not None:
+            return region
+        cell = (key[1], key[2])
+        if cell != self._cell:
+            self._reset(cell)
+        alloc = self._alloc()
+        if alloc is None:
+            # Every cell is on screen or in a recycled card; this poster gets
+            # a texture of its own rather than taking a cell from another card.
+            self.overflow += 1
+            tex = Texture.create(size=size, colorfmt='rgb')
+            tex.blit_buffer(pixels, colorfmt='rgb', bufferfmt='ubyte')
+            return tex
+        page, slot = alloc
+        x = (slot % self._cols) * cell[0]
+        y = (slot // self._cols) * cell[1]
+        page.blit_buffer(pixels, size=size, colorfmt='rgb', bufferfmt='ubyte', pos=(x, y))
+        region = page.get_region(x, y, *size)
+        self._entries[key] = [page, slot, region, self.generation, 1]
+        return region
+
+    def begin_results(self):
+        # A page survives one change of results, so flipping back to the
+        # previous category is still instant; after that, pages holding only
+        # posters from older results are released as a whole.
+        self.generation += 1
+        keep = self.generation - 1
+        live = {id(e[0]) for e in self._entries.values() if e[3] >= keep or e[4]}
+        dropped = [p for p in self._pages if id(p) not in live]
+        if not dropped:
+            return
+        gone = {id(p) for p in dropped}
+        self._pages = [p for p in self._pages if id(p) not in gone]
+        self._free = [f for f in self._free if id(f[0]) not in gone]
+        for key in [k for k, e in self._entries.items() if id(e[0]) in gone]:
+            del self._entries[key]
+        self.pages_dropped += len(dropped)
+
+    def stats(self):
+        return {
+            'pages': len(self._pages), 'entries': len(self._entries), 'evicted': self.evicted,
+            'pages_dropped': self.pages_dropped, 'overflow': self.overflow,
+        }
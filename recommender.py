@@ -0,0 +1,161 @@
+import math
+import re
+import threading
+import zlib
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has he her his in into is it its of on or
+she that the their them they this to was were when who will with after while
+""".split())
+
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall((text or '').lower()) if t not in STOPWORDS and len(t) > 2]
+
+
+class Recommender:
+    def __init__(self, genre_ids, text_dims=128, genre_weight=1.0, text_weight=1.0,
+                 numeric_weight=0.35, reweight_growth=1.25):
+        self.genre_index = {g: i for i, g in enumerate(genre_ids)}
+        self.text_dims = text_dims
+        self.genre_weight = genre_weight
+        self.text_weight = text_weight
+        self.numeric_weight = numeric_weight
+        self.reweight_growth = reweight_growth
+        self.dims = len(self.genre_index) + text_dims + 2
+        self.ids = []
+        self.rows = {}
+        self._df = np.zeros(text_dims, dtype=np.float32)
+        # Hashed term counts kept as COO triples so the text block can be
+        # re-weighted for every row at once when the idf drifts.
+        self._tf_rows = []
+        self._tf_slots = []
+        self._tf_vals = []
+        # Rows are stored L2-normalised; _norms keeps the original lengths so
+        # a row can be scaled back before its text block is replaced.
+        self._matrix = np.zeros((0, self.dims), dtype=np.float32)
+        self._norms = np.zeros(0, dtype=np.float32)
+        self._weighted_at = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _idf(self):
+        n = max(len(self.ids), 1)
+        return (np.log((1 + n) / (1 + self._df)) + 1).astype(np.float32)
+
+    def _grow(self, needed):
+        cap = len(self._matrix)
+        if needed <= cap:
+            return
+        size = max(needed, cap * 2, 256)
+        grown = np.zeros((size, self.dims), dtype=np.float32)
+        grown[:cap] = self._matrix
+        norms = np.ones(size, dtype=np.float32)
+        norms[:cap] = self._norms
+        self._matrix = grown
+        self._norms = norms
+
+    def _fill_text(self, start, stop, idf, rows, slots, vals):
+        weights = vals * idf[slots]
+        lengths = np.sqrt(np.bincount(rows - start, weights * weights, minlength=stop - start))
+        lengths[lengths == 0] = 1
+        g0 = len(self.genre_index)
+        block = self._matrix[start:stop]
+        block[:, g0:g0 + self.text_dims] = 0
+        block[rows - start, g0 + slots] = self.text_weight * weights / lengths[rows - start]
+
+    def _normalise(self, start, stop):
+        block = self._matrix[start:stop]
+        norms = np.linalg.norm(block, axis=1)
+        norms[norms == 0] = 1
+        block /= norms[:, None]
+        self._norms[start:stop] = norms
+
+    def add(self, movies):
+        with self._lock:
+            start = len(self.ids)
+            fresh = {mv.id: mv for mv in movies if mv.id not in self.rows}
+            fresh = list(fresh.values())
+            if not fresh:
+                return
+            self._grow(start + len(fresh))
+            block = self._matrix[start:start + len(fresh)]
+            block[:] = 0
+            t_rows, t_slots, t_vals = [], [], []
+            votes = np.zeros(len(fresh), dtype=np.float32)
+            years = np.zeros(len(fresh), dtype=np.float32)
+            for j, mv in enumerate(fresh):
+                i = start + j
+                self.rows[mv.id] = i
+                self.ids.append(mv.id)
+
+                genres = [self.genre_index[g] for g in mv.genre_ids if g in self.genre_index]
+                if genres:
+                    block[j, genres] = self.genre_weight / math.sqrt(len(genres))
+
+                counts = {}
+                for tok in tokenize(mv.overview):
+                    slot = zlib.crc32(tok.encode()) % self.text_dims
+                    counts[slot] = counts.get(slot, 0) + 1
+                t_rows.extend([i] * len(counts))
+                t_slots.extend(counts.keys())
+                t_vals.extend(counts.values())
+
+                votes[j] = mv.vote_average or 0
+                year = mv.release_date[:4]
+                years[j] = int(year) if year.isdigit() else 2000
+
+            rows = np.array(t_rows, dtype=np.int64)
+            slots = np.array(t_slots, dtype=np.int64)
+            vals = 1 + np.log(np.array(t_vals, dtype=np.float32))
+            self._tf_rows.append(rows)
+            self._tf_slots.append(slots)
+            self._tf_vals.append(vals)
+            np.add.at(self._df, slots, 1)
+            block[:, -2] = self.numeric_weight * (votes - 5) / 5
+            block[:, -1] = self.numeric_weight * (years - 2000) / 40
+
+            n = len(self.ids)
+            idf = self._idf()
+            if n >= self._weighted_at * self.reweight_growth:
+                self._tf_rows = [np.concatenate(self._tf_rows)]
+                self._tf_slots = [np.concatenate(self._tf_slots)]
+                self._tf_vals = [np.concatenate(self._tf_vals)]
+                self._matrix[:start] *= self._norms[:start, None]
+                self._fill_text(0, n, idf, self._tf_rows[0], self._tf_slots[0], self._tf_vals[0])
+                self._normalise(0, n)
+                self._weighted_at = n
+            else:
+                self._fill_text(start, n, idf, rows, slots, vals)
+                self._normalise(start, n)
+
+    def similar(self, movie_id, k=10):
+        return self.similar_many([movie_id], k)[0]
+
+    def similar_many(self, movie_ids, k=10):
+        with self._lock:
+            n = len(self.ids)
+            found = [self.rows.get(mid) for mid in movie_ids]
+            picks = [r for r in found if r is not None]
+            if not picks or n < 2:
+                return [[] for _ in movie_ids]
+            scores = self._matrix[:n] @ self._matrix[picks].T
+            scores[picks, np.arange(len(picks))] = -np.inf
+            k = min(k, n - 1)
+            top = np.argpartition(-scores, k - 1, axis=0)[:k]
+            out = []
+            col = 0
+            for r in found:
+                if r is None:
+                    out.append([])
+                    continue
+                cand = top[:, col]
+                cand = cand[np.argsort(-scores[cand, col])]
+                out.append([self.ids[i] for i in cand])
+                col += 1
+            return out
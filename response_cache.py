@@ -0,0 +1,138 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_TTL = 3600
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+
+
+class ResponseCache:
+    def __init__(self, path, ttls=None, default_ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            ' key TEXT PRIMARY KEY, endpoint TEXT NOT NULL, payload TEXT NOT NULL,'
+            ' size INTEGER NOT NULL, stored REAL NOT NULL, accessed REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS responses_lru ON responses (accessed)')
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(responses)')}
+        if 'etag' not in columns:
+            self._conn.execute('ALTER TABLE responses ADD COLUMN etag TEXT')
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(endpoint, query=None, page=1):
+        return f'{endpoint}|{query or ""}|{page}'
+
+    def ttl_for(self, endpoint):
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def get(self, endpoint, query=None, page=1):
+        key = self.make_key(endpoint, query, page)
+        now = time.time()
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    'SELECT payload, stored FROM responses WHERE key = ?', (key,)
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                payload, stored = row
+                if now - stored > self.ttl_for(endpoint):
+                    # Expired rows stay until evicted so they can be
+                    # revalidated with their ETag.
+                    self.misses += 1
+                    return None
+                self._conn.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+                self._conn.commit()
+                self.hits += 1
+            return json.loads(payload)
+        except (sqlite3.Error, ValueError) as e:
+            logging.error(f"Cache read error: {e}")
+            return None
+
+    def stale(self, endpoint, query=None, page=1):
+        key = self.make_key(endpoint, query, page)
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    'SELECT payload, etag FROM responses WHERE key = ? AND etag IS NOT NULL', (key,)
+                ).fetchone()
+            if row is None:
+                return None
+            return json.loads(row[0]), row[1]
+        except (sqlite3.Error, ValueError) as e:
+            logging.error(f"Cache read error: {e}")
+            return None
+
+    def refresh(self, endpoint, query=None, page=1):
+        key = self.make_key(endpoint, query, page)
+        now = time.time()
+        try:
+            with self._lock:
+                self._conn.execute(
+                    'UPDATE responses SET stored = ?, accessed = ? WHERE key = ?', (now, now, key),
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logging.error(f"Cache write error: {e}")
+
+    def put(self, endpoint, query, page, rows, etag=None):
+        key = self.make_key(endpoint, query, page)
+        payload = json.dumps(rows, separators=(',', ':'))
+        now = time.time()
+        try:
+            with self._lock:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO responses (key, endpoint, payload, size, stored, accessed, etag)'
+                    ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (key, endpoint, payload, len(payload), now, now, etag),
+                )
+                self._evict()
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logging.error(f"Cache write error: {e}")
+
+    def _evict(self):
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        doomed = []
+        for key, size in self._conn.execute('SELECT key, size FROM responses ORDER BY accessed'):
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        self._conn.executemany('DELETE FROM responses WHERE key = ?', doomed)
+        self.evictions += len(doomed)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses'
+            ).fetchone()
+        return {
+            'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+            'entries': entries, 'bytes': size,
+        }
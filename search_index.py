@@ -0,0 +1,96 @@
+import bisect
+import math
+import re
+import threading
+import unicodedata
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+MAX_PREFIX_TERMS = 32
+
+
+def tokenize(text):
+    folded = unicodedata.normalize('NFKD', (text or '').lower())
+    return TOKEN_RE.findall(folded.encode('ascii', 'ignore').decode('ascii'))
+
+
+class SearchIndex:
+    def __init__(self, k1=1.2, b=0.75, title_boost=3.0):
+        self.k1 = k1
+        self.b = b
+        self.title_boost = title_boost
+        self.ids = []
+        self._rows = {}
+        self._lengths = []
+        self._total_length = 0
+        self._postings = {}
+        self._terms = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, movie_id):
+        return movie_id in self._rows
+
+    def add(self, movies):
+        with self._lock:
+            for mv in movies:
+                if mv.id in self._rows:
+                    continue
+                doc = len(self.ids)
+                self._rows[mv.id] = doc
+                self.ids.append(mv.id)
+                weights = {}
+                for tok in tokenize(mv.title):
+                    weights[tok] = weights.get(tok, 0) + self.title_boost
+                for tok in tokenize(mv.overview):
+                    weights[tok] = weights.get(tok, 0) + 1
+                length = sum(weights.values())
+                self._lengths.append(length)
+                self._total_length += length
+                for tok, w in weights.items():
+                    posting = self._postings.get(tok)
+                    if posting is None:
+                        posting = self._postings[tok] = {}
+                        bisect.insort(self._terms, tok)
+                    posting[doc] = w
+
+    def _expand(self, prefix):
+        lo = bisect.bisect_left(self._terms, prefix)
+        hi = bisect.bisect_left(self._terms, prefix + '\uffff', lo)
+        return self._terms[lo:min(hi, lo + MAX_PREFIX_TERMS)]
+
+    def search(self, query, limit=20, prefix=True):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        with self._lock:
+            n = len(self.ids)
+            if not n:
+                return []
+            avgdl = self._total_length / n
+            scores = {}
+            last = len(tokens) - 1
+            for pos, tok in enumerate(tokens):
+                terms = self._expand(tok) if prefix and pos == last else [tok]
+                best = {}
+                for term in terms:
+                    posting = self._postings.get(term)
+                    if not posting:
+                        continue
+                    idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+                    for doc, tf in posting.items():
+                        dl = self._lengths[doc]
+                        s = idf * tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * dl / avgdl))
+                        if s > best.get(doc, 0):
+                            best[doc] = s
+                if not best:
+                    return []
+                if pos == 0:
+                    scores = best
+                else:
+                    scores = {d: s + best[d] for d, s in scores.items() if d in best}
+                if not scores:
+                    return []
+            ranked = sorted(scores.items(), key=lambda kv: -kv[1])[:limit]
+            return [(self.ids[d], s) for d, s in ranked]
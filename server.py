@@ -0,0 +1,330 @@
+import argparse
+import asyncio
+import json
+import logging
+import re
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from movie_data import (
+    CATALOG_LISTS, GENRES, MovieDetails, client_stats, fetch_movie, fetch_movies,
+    get_catalog, response_cache, tracer,
+)
+from movie_store import MovieStore
+from poster_store import IMAGE_BASE
+
+LISTS = ('popular', 'top_rated', 'now_playing')
+CATALOG_NAMES = set(CATALOG_LISTS.values())
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 64 * 1024
+IDLE_TIMEOUT = 15
+MAX_PAGE = 500
+REASONS = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+    431: 'Request Header Fields Too Large', 500: 'Internal Server Error', 502: 'Bad Gateway',
+    503: 'Service Unavailable',
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def movie_json(movie):
+    d = movie.to_dict()
+    d['year'] = movie.year
+    d['genres'] = [GENRES[g] for g in movie.genre_ids if g in GENRES]
+    d['poster_url'] = f"{IMAGE_BASE}/w342{movie.poster_path}" if movie.poster_path else None
+    return d
+
+
+def encode(payload):
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+
+def int_arg(qs, name, default, lo, hi):
+    try:
+        value = int(qs.get(name, [default])[0])
+    except ValueError:
+        raise HTTPError(400, f"{name} must be an integer")
+    if not lo <= value <= hi:
+        raise HTTPError(400, f"{name} must be between {lo} and {hi}")
+    return value
+
+
+class MovieServer:
+    def __init__(self, workers=16, cache_ttl=60, cache_entries=4096, store_bytes=64 * 1024 * 1024):
+        self.store = MovieStore(store_bytes)
+        self.recommender = None
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='api')
+        self.cache_ttl = cache_ttl
+        self.cache_entries = cache_entries
+        self.started = time.time()
+        self.connections = 0
+        self.peak_connections = 0
+        self.requests = 0
+        self.statuses = Counter()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.coalesced = 0
+        self._cache = OrderedDict()
+        self._inflight = {}
+        self.routes = [
+            (re.compile(r'/api/lists/(\w+)'), 'lists', self.list_page),
+            (re.compile(r'/api/search'), 'search', self.search),
+            (re.compile(r'/api/movies/(\d+)'), 'movie', self.movie),
+            (re.compile(r'/api/movies/(\d+)/similar'), 'similar', self.similar),
+            (re.compile(r'/api/genres'), 'genres', self.genres),
+            (re.compile(r'/api/metrics'), 'metrics', self.metrics),
+            (re.compile(r'/healthz'), 'health', self.health),
+        ]
+
+    async def run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, func, *args)
+
+    async def cached(self, key, produce):
+        # Every client asking for the same page within cache_ttl shares one
+        # encoded body, and concurrent misses share one upstream fetch.
+        now = time.monotonic()
+        hit = self._cache.get(key)
+        if hit is not None and hit[0] > now:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return hit[1]
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+        self.cache_misses += 1
+        fut = self._inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            body, keep = await produce()
+            if keep:
+                self._cache[key] = (time.monotonic() + self.cache_ttl, body)
+                while len(self._cache) > self.cache_entries:
+                    self._cache.popitem(last=False)
+            fut.set_result(body)
+            return body
+        except Exception as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            # A cancelled owner (shutdown or a dropped connection) must still
+            # settle the future, or every coalesced waiter hangs on it.
+            if not fut.done():
+                fut.set_exception(HTTPError(503, "Request was cancelled; try again"))
+            fut.exception()
+            self._inflight.pop(key, None)
+
+    def _ingest(self, movies):
+        for mv in movies:
+            self.store.put(mv)
+        if self.recommender is None:
+            from recommender import Recommender
+            self.recommender = Recommender(list(GENRES))
+        self.recommender.add(movies)
+
+    def _load_list(self, name, page):
+        cat = get_catalog() if name in CATALOG_NAMES else None
+        if cat is not None:
+            rows = cat.page(name, page)
+            return [MovieDetails.from_dict(d) for d in rows] if rows else []
+        return fetch_movies(name, None, page)
+
+    async def _page_body(self, movies, **meta):
+        # fetch_movies returns None when TMDB could not be reached and an
+        # empty list when the page really has no results.
+        if movies is None:
+            raise HTTPError(502, "Upstream TMDB request failed")
+        if movies:
+            await self.run(self._ingest, movies)
+        meta['results'] = [movie_json(mv) for mv in movies]
+        return encode(meta), True
+
+    async def list_page(self, qs, name):
+        if name not in LISTS:
+            raise HTTPError(404, f"Unknown list {name!r}")
+        page = int_arg(qs, 'page', 1, 1, MAX_PAGE)
+
+        async def produce():
+            movies = await self.run(self._load_list, name, page)
+            return await self._page_body(movies, list=name, page=page)
+        return await self.cached(('list', name, page), produce)
+
+    async def search(self, qs):
+        query = (qs.get('q') or qs.get('query') or [''])[0].strip()
+        if not query:
+            raise HTTPError(400, "q is required")
+        page = int_arg(qs, 'page', 1, 1, MAX_PAGE)
+
+        async def produce():
+            movies = await self.run(fetch_movies, 'search', query, page)
+            return await self._page_body(movies, query=query, page=page)
+        return await self.cached(('search', query.lower(), page), produce)
+
+    async def movie(self, qs, movie_id):
+        movie_id = int(movie_id)
+
+        async def produce():
+            movie = self.store.get(movie_id)
+            if movie is None:
+                try:
+                    movie = await self.run(fetch_movie, movie_id)
+                except KeyError:
+                    raise HTTPError(404, f"Movie {movie_id} not found") from None
+                if movie is None:
+                    raise HTTPError(502, "Upstream TMDB request failed")
+                await self.run(self._ingest, [movie])
+            return encode(movie_json(movie)), True
+        return await self.cached(('movie', movie_id), produce)
+
+    async def similar(self, qs, movie_id):
+        movie_id = int(movie_id)
+        k = int_arg(qs, 'k', 10, 1, 50)
+        if self.recommender is None:
+            raise HTTPError(503, "No movies loaded yet; fetch a list or search first")
+
+        async def produce():
+            ids = await self.run(self.recommender.similar, movie_id, k)
+            movies = [m for m in (self.store.get(i) for i in ids) if m]
+            return encode({'id': movie_id, 'results': [movie_json(m) for m in movies]}), True
+        return await self.cached(('similar', movie_id, k), produce)
+
+    async def genres(self, qs):
+        return encode({'genres': [{'id': g, 'name': n} for g, n in GENRES.items()]})
+
+    async def health(self, qs):
+        return b'{"ok":true}'
+
+    async def metrics(self, qs):
+        latency = {name[5:]: h for name, h in tracer.histograms().items() if name.startswith('http ')}
+        return encode({
+            'uptime_s': round(time.time() - self.started, 1),
+            'connections': self.connections,
+            'peak_connections': self.peak_connections,
+            'requests': self.requests,
+            'statuses': dict(self.statuses),
+            'cache': {
+                'hits': self.cache_hits, 'misses': self.cache_misses, 'coalesced': self.coalesced,
+                'entries': len(self._cache),
+            },
+            'movies': len(self.store),
+            'latency_ms': latency,
+            'upstream': client_stats(),
+            'response_cache': response_cache.stats(),
+        })
+
+    async def dispatch(self, method, target):
+        parts = urlsplit(target)
+        for pattern, route, handler in self.routes:
+            match = pattern.fullmatch(parts.path)
+            if match is None:
+                continue
+            if method not in ('GET', 'HEAD'):
+                return 405, encode({'error': 'Only GET is supported'}), route
+            try:
+                return 200, await handler(parse_qs(parts.query), *match.groups()), route
+            except HTTPError as e:
+                return e.status, encode({'error': e.message}), route
+            except Exception as e:
+                logging.error(f"API error for {target}: {e}")
+                return 500, encode({'error': 'Internal error'}), route
+        return 404, encode({'error': 'Not found'}), 'unknown'
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        self.peak_connections = max(self.peak_connections, self.connections)
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), IDLE_TIMEOUT)
+                except asyncio.LimitOverrunError:
+                    writer.write(self._response(431, encode({'error': 'Headers too large'}), False))
+                    break
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                start = time.perf_counter_ns()
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ', 2)
+                except ValueError:
+                    writer.write(self._response(400, encode({'error': 'Bad request line'}), False))
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(':')
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                length = headers.get('content-length') or '0'
+                if not (length.isascii() and length.isdigit()):
+                    writer.write(self._response(400, encode({'error': 'Bad Content-Length'}), False))
+                    break
+                length = int(length)
+                if length > MAX_BODY_BYTES:
+                    writer.write(self._response(413, encode({'error': 'Request body too large'}), False))
+                    break
+                if length:
+                    await asyncio.wait_for(reader.readexactly(length), IDLE_TIMEOUT)
+                connection = headers.get('connection', '').lower()
+                keep = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+                status, body, route = await self.dispatch(method, target)
+                self.requests += 1
+                self.statuses[status] += 1
+                writer.write(self._response(status, b'' if method == 'HEAD' else body, keep, len(body)))
+                await writer.drain()
+                tracer.record(f'http {route}', start, status=status)
+                if not keep:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    @staticmethod
+    def _response(status, body, keep, length=None):
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body) if length is None else length}\r\n"
+            f"Connection: {'keep-alive' if keep else 'close'}\r\n\r\n"
+        )
+        return head.encode('latin-1') + body
+
+
+async def serve(host='127.0.0.1', port=8080, backlog=4096, **kwargs):
+    api = MovieServer(**kwargs)
+    server = await asyncio.start_server(api.handle, host, port, backlog=backlog, limit=MAX_HEADER_BYTES)
+    addr = server.sockets[0].getsockname()
+    logging.info(f"Serving movie API on http://{addr[0]}:{addr[1]}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve category lists, search and movie details over HTTP/JSON.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=16, help='threads for upstream fetches')
+    parser.add_argument('--cache-ttl', type=float, default=60, help='seconds to reuse an encoded response')
+    parser.add_argument('--cache-entries', type=int, default=4096)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, workers=args.workers, cache_ttl=args.cache_ttl,
+                          cache_entries=args.cache_entries))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
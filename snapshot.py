@@ -0,0 +1,90 @@
+import json
+import logging
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+
+from movie_data import MovieDetails
+
+MAGIC = b'TMDBSNP1'
+VERSION = 1
+STRING_FIELDS = ('title', 'overview', 'release_date', 'poster_path')
+
+
+def _le(arr):
+    if sys.byteorder == 'big':
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def encode(state, movies):
+    ids = array('I', (m.id for m in movies))
+    votes = array('d', (m.vote_average for m in movies))
+    counts = array('B', (min(255, len(m.genre_ids)) for m in movies))
+    genres = array('I', (g for m in movies for g in m.genre_ids[:255]))
+    strings = '\0'.join(getattr(m, f) or '' for m in movies for f in STRING_FIELDS).encode('utf-8')
+    header = json.dumps(dict(state, version=VERSION, count=len(movies), genres=len(genres),
+                             saved_at=time.time())).encode('utf-8')
+    body = zlib.compress(_le(ids) + _le(votes) + counts.tobytes() + _le(genres) + strings, 6)
+    return MAGIC + struct.pack('<I', len(header)) + header + body
+
+
+def decode(blob):
+    if blob[:len(MAGIC)] != MAGIC:
+        raise ValueError("not a grid snapshot")
+    (hlen,) = struct.unpack_from('<I', blob, len(MAGIC))
+    start = len(MAGIC) + 4
+    state = json.loads(blob[start:start + hlen])
+    if state.get('version') != VERSION:
+        raise ValueError(f"unsupported snapshot version {state.get('version')}")
+    body = memoryview(zlib.decompress(blob[start + hlen:]))
+    n, ng = state['count'], state['genres']
+    cols = []
+    offset = 0
+    for code, length in (('I', n), ('d', n), ('B', n), ('I', ng)):
+        arr = array(code)
+        size = arr.itemsize * length
+        arr.frombytes(body[offset:offset + size])
+        if sys.byteorder == 'big' and arr.itemsize > 1:
+            arr.byteswap()
+        cols.append(arr)
+        offset += size
+    ids, votes, counts, genres = cols
+    strings = bytes(body[offset:]).decode('utf-8').split('\0') if n else []
+    if len(strings) != n * len(STRING_FIELDS):
+        raise ValueError("truncated snapshot")
+    movies = []
+    g = 0
+    for i in range(n):
+        title, overview, release_date, poster_path = strings[i * 4:i * 4 + 4]
+        movies.append(MovieDetails(
+            title, overview, release_date, poster_path, ids[i],
+            vote_average=votes[i], genre_ids=genres[g:g + counts[i]],
+        ))
+        g += counts[i]
+    return state, movies
+
+
+def save(path, state, movies):
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp = f'{path}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(encode(state, movies))
+    os.replace(tmp, path)
+    return path
+
+
+def load(path):
+    try:
+        with open(path, 'rb') as f:
+            return decode(f.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, struct.error, zlib.error) as e:
+        logging.error(f"Snapshot error for {path}: {e}")
+        return None
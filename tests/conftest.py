@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# movie_data opens its response cache at import; keep it out of the repo's .cache.
+os.environ.setdefault('TMDB_CACHE_DIR', tempfile.mkdtemp(prefix='tmdb-tests-'))
+os.environ.setdefault('TMDB_TRACE', '0')
@@ -0,0 +1,104 @@
+import gzip
+import json
+import logging
+import os
+import shutil
+
+import pytest
+
+from catalog import Catalog, ingest
+
+MOVIES = [
+    {'id': 1, 'title': 'Heat', 'overview': 'Cops and robbers.', 'poster_path': '/h.jpg',
+     'release_date': '1995-12-15', 'vote_average': 7.9, 'vote_count': 900, 'popularity': 40.0,
+     'genre_ids': [80, 18]},
+    {'id': 2, 'original_title': 'Ronin', 'poster_path': '/r.jpg', 'release_date': '1998-09-25',
+     'vote_average': 7.1, 'vote_count': 150, 'popularity': 60.0, 'genres': [{'id': 28}]},
+    {'id': 3, 'title': 'Thief', 'vote_average': 8.2, 'vote_count': 500, 'popularity': 5.0},
+    {'id': 4, 'title': 'Adult', 'adult': True, 'popularity': 99.0},
+]
+
+
+def write_dump(path, rows, extra=()):
+    lines = [json.dumps(r) for r in rows] + list(extra)
+    opener = gzip.open if str(path).endswith('.gz') else open
+    with opener(path, 'wt', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    return str(path)
+
+
+@pytest.fixture
+def built(tmp_path):
+    dest = str(tmp_path / 'movies.cat')
+    assert ingest(write_dump(tmp_path / 'dump.json.gz', MOVIES), dest, min_votes=300) == 3
+    cat = Catalog(dest)
+    yield cat
+    cat.close()
+
+
+def test_lists_are_ordered_by_popularity_and_rating(built):
+    assert [m['id'] for m in built.page('popular', 1)] == [2, 1, 3]
+    assert [m['id'] for m in built.page('top_rated', 1)] == [3, 1]
+    assert built.page('popular', 2) == []
+
+
+def test_rows_round_trip_through_the_columns(built):
+    heat = built.page('popular', 1, per_page=2)[1]
+    assert heat['title'] == 'Heat'
+    assert heat['overview'] == 'Cops and robbers.'
+    assert heat['release_date'] == '1995-12-15'
+    assert heat['vote_average'] == pytest.approx(7.9, abs=1e-3)
+    assert sorted(heat['genre_ids']) == [18, 80]
+    ronin = built.row(1)
+    assert ronin['title'] == 'Ronin'
+    assert ronin['genre_ids'] == [28]
+    assert list(built.titles('popular', 2)) == [(2, 'Ronin'), (1, 'Heat')]
+
+
+def test_malformed_lines_are_skipped(tmp_path, caplog):
+    bad = ['not json', '[1, 2]', '"text"', json.dumps({'title': 'No id'}),
+           json.dumps({'id': 'x', 'title': 'Bad id'}), json.dumps({'id': 5, 'title': 7})]
+    dest = str(tmp_path / 'movies.cat')
+    with caplog.at_level(logging.WARNING):
+        rows = ingest(write_dump(tmp_path / 'dump.json', MOVIES[:1], bad), dest)
+    assert rows == 2
+    assert 'skipped 5 malformed rows' in caplog.text
+    cat = Catalog(dest)
+    assert cat.row(1)['title'] == '7'
+    cat.close()
+
+
+def test_genres_past_the_mask_are_reported(tmp_path, caplog):
+    rows = [{'id': 1, 'title': 'Many', 'genre_ids': list(range(100, 140))}]
+    dest = str(tmp_path / 'movies.cat')
+    with caplog.at_level(logging.WARNING):
+        ingest(write_dump(tmp_path / 'dump.json', rows), dest)
+    assert 'ignored genre ids [132' in caplog.text
+    cat = Catalog(dest)
+    assert cat.row(0)['genre_ids'] == list(range(100, 132))
+    cat.close()
+
+
+def test_failed_ingest_leaves_no_partial_files(tmp_path, monkeypatch):
+    src = write_dump(tmp_path / 'dump.json', MOVIES)
+    dest = str(tmp_path / 'movies.cat')
+
+    def broken(*args):
+        raise OSError('disk full')
+    monkeypatch.setattr(shutil, 'copyfileobj', broken)
+    with pytest.raises(OSError):
+        ingest(src, dest)
+    assert sorted(os.listdir(tmp_path)) == ['dump.json']
+
+
+def test_missing_source_raises_the_real_error(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ingest(str(tmp_path / 'missing.json'), str(tmp_path / 'movies.cat'))
+    assert os.listdir(tmp_path) == []
+
+
+def test_rejects_files_that_are_not_catalogs(tmp_path):
+    path = tmp_path / 'junk.cat'
+    path.write_bytes(b'x' * 64)
+    with pytest.raises(ValueError):
+        Catalog(str(path))
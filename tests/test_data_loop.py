@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from data_loop import CALL_CONCURRENCY, DataLoop
+
+
+@pytest.fixture
+def data():
+    loop = DataLoop(max_concurrency=2)
+    yield loop
+    loop.stop()
+
+
+def test_a_newer_keyed_action_cancels_the_old_one(data):
+    started = threading.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(10)
+
+    async def quick():
+        return 'done'
+    old = data.submit(slow(), key='grid')
+    assert started.wait(2)
+    new = data.submit(quick(), key='grid')
+    assert new.result(2) == 'done'
+    assert old.cancelled()
+    assert data.stats()['cancelled'] == 1
+
+
+def test_cancel_by_key(data):
+    started = threading.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(10)
+    fut = data.submit(slow(), key='feed')
+    assert started.wait(2)
+    data.cancel('feed')
+    assert fut.cancelled()
+    data.cancel('feed')
+    assert data.stats()['cancelled'] == 1
+
+
+def test_failures_are_counted_not_raised(data):
+    async def broken():
+        raise ValueError('boom')
+    assert data.submit(broken()).result(2) is None
+    assert data.stats()['failed'] == 1
+
+
+def test_blocking_calls_never_exceed_the_limit(data):
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def work(i):
+        with lock:
+            running.append(i)
+            peak.append(len(running))
+        time.sleep(0.02)
+        with lock:
+            running.remove(i)
+        return i
+
+    async def many():
+        return await asyncio.gather(*(data.blocking(work, i) for i in range(8)))
+    assert data.submit(many()).result(5) == list(range(8))
+    assert max(peak) == 2
+    assert data.stats()['peak'] == 2
+
+
+def test_a_cancelled_caller_keeps_its_permit_until_the_worker_finishes(data):
+    release = threading.Event()
+    entered = threading.Event()
+
+    def stuck():
+        entered.set()
+        release.wait(5)
+
+    first = data.submit(data.blocking(stuck), key='a')
+    assert entered.wait(2)
+    data.cancel('a')
+    assert first.cancelled()
+    data.submit(data.blocking(stuck))
+    time.sleep(0.05)
+    assert data.stats()['running'] == 2
+    release.set()
+
+
+def test_calls_have_their_own_permits(data):
+    release = threading.Event()
+    calls = []
+
+    def busy():
+        calls.append(1)
+        release.wait(5)
+
+    for _ in range(CALL_CONCURRENCY + 2):
+        data.submit(data.call(busy))
+    time.sleep(0.05)
+    assert len(calls) == CALL_CONCURRENCY
+    # Page fetches still get workers while every call permit is taken.
+    assert data.submit(data.blocking(lambda: 'page')).result(2) == 'page'
+    release.set()
+
+
+def test_pages_arrive_in_order_and_stop_early(data):
+    fetched = []
+
+    def page(n):
+        time.sleep(0.01 * (5 - n))
+        fetched.append(n)
+        return [n]
+
+    async def first_two():
+        out = []
+        agen = data.pages(page, 4, first=2)
+        async for p in agen:
+            out.append(p)
+            if len(out) == 2:
+                await agen.aclose()
+                break
+        return out
+    assert data.submit(first_two()).result(5) == [[2], [3]]
+
+
+def test_stop_drops_new_work(data):
+    data.stop()
+    assert data.submit(asyncio.sleep(0)) is None
@@ -0,0 +1,74 @@
+from facets import FacetIndex, year_bucket
+from movie_data import MovieDetails
+
+GENRES = {28: 'Action', 35: 'Comedy', 18: 'Drama'}
+
+
+def movie(mid, date, rating, genres):
+    return MovieDetails(f'Movie {mid}', '', date, f'/{mid}.jpg', mid, rating, genres)
+
+
+def index():
+    idx = FacetIndex(GENRES)
+    for mv in (
+        movie(1, '2021-05-01', 8.4, [28]),
+        movie(2, '2015-01-01', 7.2, [35, 18]),
+        movie(3, '1999-12-31', 6.1, [28, 18]),
+        movie(4, '', 5.0, [99]),
+        movie(5, '2012-07-04', 4.2, [35]),
+    ):
+        idx.add(mv)
+    return idx
+
+
+def ids(idx, bits):
+    return [m.id for m in idx.movies_in(bits)]
+
+
+def test_year_bucket():
+    assert year_bucket(movie(1, '2024-01-01', 0, [])) == '2020s'
+    assert year_bucket(movie(1, '1989-01-01', 0, [])) == 'Older'
+    assert year_bucket(movie(1, '', 0, [])) is None
+    assert year_bucket(movie(1, 'n/a', 0, [])) is None
+
+
+def test_select_combines_facets():
+    idx = index()
+    assert ids(idx, idx.select()) == [1, 2, 3, 4, 5]
+    assert ids(idx, idx.select(genre=28)) == [1, 3]
+    assert ids(idx, idx.select(genre=18, year='1990s')) == [3]
+    assert ids(idx, idx.select(genre=35, year='2010s', rating='7+')) == [2]
+    assert ids(idx, idx.select(genre=10749)) == []
+
+
+def test_rating_buckets_are_cumulative():
+    idx = index()
+    assert ids(idx, idx.select(rating='8+')) == [1]
+    assert ids(idx, idx.select(rating='7+')) == [1, 2]
+    assert ids(idx, idx.select(rating='5+')) == [1, 2, 3, 4]
+
+
+def test_add_is_idempotent_and_clear_resets():
+    idx = index()
+    assert idx.add(movie(2, '2015-01-01', 7.2, [35, 18])) == 1
+    assert len(idx) == 5
+    idx.clear()
+    assert len(idx) == 0
+    assert idx.select() == 0
+    assert ids(idx, idx.select(genre=28)) == []
+
+
+def test_accepts():
+    idx = index()
+    assert idx.accepts(idx.movies[0], genre=28, rating='8+')
+    assert not idx.accepts(idx.movies[1], genre=28)
+    assert not idx.accepts(movie(42, '2020-01-01', 9, [28]))
+
+
+def test_counts_each_facet_against_the_others():
+    counts = index().counts(genre=28)
+    assert counts['total'] == 2
+    # Genre counts ignore the genre pick itself, so switching is predictable.
+    assert counts['genre'] == {28: 2, 35: 2, 18: 2}
+    assert counts['year'] == {'2020s': 1, '2010s': 0, '2000s': 0, '1990s': 1, 'Older': 0}
+    assert counts['rating'] == {'8+': 1, '7+': 1, '6+': 2, '5+': 2}
@@ -0,0 +1,50 @@
+from fuzzy import FuzzyTitleIndex, bounded_distance, normalize, trigrams
+
+
+def test_normalize_folds_accents_and_punctuation():
+    assert normalize('  Amélie: Le Fabuleux-Destin! ') == 'amelie le fabuleux destin'
+
+
+def test_trigrams_are_padded():
+    assert trigrams('up') == {'  u', ' up', 'up '}
+
+
+def test_bounded_distance_stops_past_the_limit():
+    assert bounded_distance('kitten', 'sitting', 3) == 3
+    assert bounded_distance('kitten', 'sitting', 1) == 2
+    assert bounded_distance('a', 'abcdef', 2) == 3
+
+
+def index(*titles):
+    idx = FuzzyTitleIndex()
+    for mid, title in enumerate(titles, 1):
+        idx.add(mid, title)
+    return idx
+
+
+def test_typos_match_the_closest_title():
+    idx = index('The Godfather', 'Goodfellas', 'Interstellar')
+    assert idx.match('the godfahter')[0][:2] == ('The Godfather', 2)
+    title, dist, ids = idx.match('intersteller')[0]
+    assert (title, dist, ids) == ('Interstellar', 1, [3])
+
+
+def test_exact_match_has_zero_distance():
+    idx = index('Heat', 'Ronin')
+    assert idx.match('heat') == [('Heat', 0, [1])]
+
+
+def test_unrelated_queries_find_nothing():
+    idx = index('Heat', 'Ronin')
+    assert idx.match('zzzzzz') == []
+    assert idx.match('') == []
+    assert FuzzyTitleIndex().match('heat') == []
+
+
+def test_same_title_collects_movie_ids():
+    idx = FuzzyTitleIndex()
+    idx.add(1, 'Dune')
+    idx.add(2, 'DUNE')
+    idx.add(2, 'Dune')
+    assert len(idx) == 1
+    assert idx.match('dune') == [('Dune', 0, [1, 2])]
@@ -0,0 +1,49 @@
+from movie_data import MovieDetails
+from movie_store import MovieStore, record_size
+
+
+def movie(mid, overview='A heist goes wrong.'):
+    return MovieDetails(f'Movie {mid}', overview, '1995-12-15', f'/{mid}.jpg', mid, 7.5, [80, 18])
+
+
+def test_evicts_least_recently_used_past_the_byte_cap():
+    size = record_size(movie(1))
+    store = MovieStore(max_bytes=size * 3)
+    for mid in (1, 2, 3):
+        store.put(movie(mid))
+    assert store.get(1).id == 1
+    store.put(movie(4))
+    assert 2 not in store
+    assert [mid for mid in (1, 3, 4) if mid in store] == [1, 3, 4]
+    assert store.stats()['evictions'] == 1
+    assert store.bytes <= store.max_bytes
+
+
+def test_replacing_a_movie_keeps_the_byte_count():
+    store = MovieStore()
+    store.put(movie(1))
+    before = store.bytes
+    store.put(movie(1, overview='A heist goes wrong.'))
+    assert len(store) == 1
+    assert store.bytes == before
+
+
+def test_keeps_the_newest_movie_even_if_it_alone_is_over_the_cap():
+    store = MovieStore(max_bytes=1)
+    store.put(movie(1))
+    store.put(movie(2))
+    assert len(store) == 1
+    assert store[2].id == 2
+
+
+def test_counts_hits_and_misses():
+    store = MovieStore()
+    store.put(movie(1))
+    assert store.get(1) is not None
+    assert store.get(2, 'missing') == 'missing'
+    stats = store.stats()
+    assert (stats['hits'], stats['misses']) == (1, 1)
+
+
+def test_identical_genre_lists_share_one_tuple():
+    assert movie(1).genre_ids is movie(2).genre_ids
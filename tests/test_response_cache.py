@@ -0,0 +1,112 @@
+import pytest
+
+import movie_data
+from response_cache import ResponseCache
+
+ROWS = [{'id': 1, 'title': 'Heat', 'poster_path': '/h.jpg', 'genre_ids': [80]}]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(str(tmp_path / 'responses.db'), ttls={'popular': 60, 'search': -1})
+
+
+def test_fresh_hit_and_miss(cache):
+    assert cache.get('popular', None, 1) is None
+    cache.put('popular', None, 1, ROWS)
+    assert cache.get('popular', None, 1) == ROWS
+    assert cache.get('popular', None, 2) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_expired_rows_are_kept_for_revalidation(cache):
+    cache.put('search', 'heat', 1, ROWS, etag='"v1"')
+    assert cache.get('search', 'heat', 1) is None
+    assert cache.stale('search', 'heat', 1) == (ROWS, '"v1"')
+    cache.ttls['search'] = 60
+    cache.refresh('search', 'heat', 1)
+    assert cache.get('search', 'heat', 1) == ROWS
+
+
+def test_rows_without_etag_cannot_be_revalidated(cache):
+    cache.put('search', 'heat', 1, ROWS)
+    assert cache.stale('search', 'heat', 1) is None
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'responses.db'), max_bytes=250)
+    rows = [{'id': i, 'title': 'x' * 40} for i in range(2)]
+    cache.put('popular', None, 1, rows)
+    cache.put('popular', None, 2, rows)
+    cache.get('popular', None, 1)
+    cache.put('popular', None, 3, rows)
+    assert cache.get('popular', None, 2) is None
+    assert cache.get('popular', None, 1) == rows
+    assert cache.evictions == 1
+
+
+class FakeClient:
+    def __init__(self, reply):
+        self.reply = reply
+        self.etags = []
+
+    def movie_list(self, endpoint, page=1, query=None, etag=None):
+        self.etags.append(etag)
+        return self.reply
+
+
+@pytest.fixture
+def fetch(cache, monkeypatch):
+    monkeypatch.setattr(movie_data, 'response_cache', cache)
+
+    def use(reply):
+        client = FakeClient(reply)
+        monkeypatch.setattr(movie_data, 'tmdb_client', lambda: client)
+        return client
+    return use
+
+
+def test_fetch_movies_revalidates_with_etag(cache, fetch):
+    cache.put('search', 'heat', 1, ROWS, etag='"v1"')
+    client = fetch((None, '"v1"'))
+    movies = movie_data.fetch_movies('search', 'heat', 1)
+    assert client.etags == ['"v1"']
+    assert [m.id for m in movies] == [1]
+    assert cache.stale('search', 'heat', 1) == (ROWS, '"v1"')
+
+
+def test_fetch_movies_stores_changed_page(cache, fetch):
+    cache.put('search', 'heat', 1, ROWS, etag='"v1"')
+    fetch(({'results': [{'id': 2, 'title': 'Ronin', 'poster_path': '/r.jpg'}]}, '"v2"'))
+    movies = movie_data.fetch_movies('search', 'heat', 1)
+    assert [m.id for m in movies] == [2]
+    rows, etag = cache.stale('search', 'heat', 1)
+    assert etag == '"v2"'
+    assert [r['id'] for r in rows] == [2]
+
+
+def test_fetch_movies_separates_empty_from_failed(cache, fetch, monkeypatch):
+    fetch(({'results': []}, None))
+    assert movie_data.fetch_movies('search', 'nothing', 1) == []
+
+    class Down:
+        def movie_list(self, *a, **kw):
+            raise ConnectionError('down')
+    monkeypatch.setattr(movie_data, 'tmdb_client', Down)
+    assert movie_data.fetch_movies('search', 'nothing', 1) is None
+
+
+def test_fetch_movie_separates_unknown_from_failed(monkeypatch):
+    from tmdb_api import TMDBError
+
+    class Upstream:
+        def __init__(self, error):
+            self.error = error
+
+        def movie(self, movie_id):
+            raise self.error
+    monkeypatch.setattr(movie_data, 'tmdb_client', lambda: Upstream(TMDBError(404, 'missing')))
+    with pytest.raises(KeyError):
+        movie_data.fetch_movie(7)
+    monkeypatch.setattr(movie_data, 'tmdb_client', lambda: Upstream(TMDBError(503, 'down')))
+    assert movie_data.fetch_movie(7) is None
@@ -0,0 +1,50 @@
+from movie_data import MovieDetails
+from search_index import SearchIndex, tokenize
+
+
+def movie(mid, title, overview=''):
+    return MovieDetails(title, overview, '', f'/{mid}.jpg', mid)
+
+
+def index(*movies):
+    idx = SearchIndex()
+    idx.add(movies)
+    return idx
+
+
+def ids(hits):
+    return [mid for mid, _ in hits]
+
+
+def test_tokenize_folds_case_and_accents():
+    assert tokenize('Amélie: LE Fabuleux-Destin') == ['amelie', 'le', 'fabuleux', 'destin']
+
+
+def test_title_matches_outrank_overview_matches():
+    idx = index(
+        movie(1, 'The Matrix'),
+        movie(2, 'Inception', 'A thief who enters dreams, like the matrix.'),
+    )
+    assert ids(idx.search('matrix')) == [1, 2]
+
+
+def test_every_query_term_must_match():
+    idx = index(movie(1, 'Blade Runner'), movie(2, 'Blade'), movie(3, 'Runner Runner'))
+    assert ids(idx.search('blade runner')) == [1]
+
+
+def test_last_term_matches_as_a_prefix():
+    idx = index(movie(1, 'Interstellar'), movie(2, 'Inception'), movie(3, 'Heat'))
+    assert sorted(ids(idx.search('inte'))) == [1]
+    assert sorted(ids(idx.search('in'))) == [1, 2]
+    assert idx.search('in', prefix=False) == []
+
+
+def test_movies_are_indexed_once_and_limit_applies():
+    idx = index(*(movie(i, f'Heat {i}') for i in range(5)))
+    idx.add([movie(0, 'Heat 0')])
+    assert len(idx) == 5
+    assert 0 in idx
+    assert len(idx.search('heat', limit=3)) == 3
+    assert idx.search('') == []
+    assert SearchIndex().search('heat') == []
@@ -0,0 +1,147 @@
+import asyncio
+import json
+
+import pytest
+
+import server
+from movie_data import MovieDetails
+from server import MovieServer
+
+
+def movie(mid, title='Heat', genres=(80, 18)):
+    return MovieDetails(title, 'Cops and robbers.', '1995-12-15', f'/{mid}.jpg', mid, 7.9, list(genres))
+
+
+@pytest.fixture
+def api(monkeypatch):
+    monkeypatch.setattr(server, 'get_catalog', lambda: None)
+    api = MovieServer(workers=2, store_bytes=1 << 20)
+    yield api
+    api.pool.shutdown(wait=True)
+
+
+def get(api, target):
+    status, body, _ = asyncio.run(api.dispatch('GET', target))
+    return status, json.loads(body)
+
+
+def test_list_page_returns_movies(api, monkeypatch):
+    monkeypatch.setattr(server, 'fetch_movies', lambda name, query, page: [movie(1), movie(2, 'Ronin')])
+    status, body = get(api, '/api/lists/popular?page=2')
+    assert status == 200
+    assert (body['list'], body['page']) == ('popular', 2)
+    assert [m['title'] for m in body['results']] == ['Heat', 'Ronin']
+    assert body['results'][0]['genres'] == ['Crime', 'Drama']
+    assert len(api.store) == 2
+
+
+def test_upstream_failure_is_502_and_empty_page_is_200(api, monkeypatch):
+    monkeypatch.setattr(server, 'fetch_movies', lambda *a: None)
+    assert get(api, '/api/search?q=heat')[0] == 502
+    monkeypatch.setattr(server, 'fetch_movies', lambda *a: [])
+    assert get(api, '/api/search?q=heat') == (200, {'query': 'heat', 'page': 1, 'results': []})
+
+
+def test_failed_fetches_are_not_cached(api, monkeypatch):
+    monkeypatch.setattr(server, 'fetch_movies', lambda *a: None)
+    get(api, '/api/lists/popular')
+    monkeypatch.setattr(server, 'fetch_movies', lambda *a: [movie(1)])
+    assert get(api, '/api/lists/popular')[0] == 200
+
+
+def test_movie_distinguishes_unknown_ids_from_upstream_failures(api, monkeypatch):
+    def unknown(mid):
+        raise KeyError(mid)
+    monkeypatch.setattr(server, 'fetch_movie', unknown)
+    assert get(api, '/api/movies/7')[0] == 404
+    monkeypatch.setattr(server, 'fetch_movie', lambda mid: None)
+    assert get(api, '/api/movies/7')[0] == 502
+    monkeypatch.setattr(server, 'fetch_movie', lambda mid: movie(mid))
+    assert get(api, '/api/movies/7')[1]['id'] == 7
+
+
+def test_similar_needs_loaded_movies(api, monkeypatch):
+    assert get(api, '/api/movies/1/similar')[0] == 503
+    monkeypatch.setattr(server, 'fetch_movies', lambda *a: [movie(1), movie(2, 'Ronin'), movie(3, 'Up', (16,))])
+    get(api, '/api/lists/popular')
+    status, body = get(api, '/api/movies/1/similar?k=1')
+    assert status == 200
+    assert [m['id'] for m in body['results']] == [2]
+
+
+@pytest.mark.parametrize('target, status', [
+    ('/api/lists/unknown', 404),
+    ('/api/lists/popular?page=0', 400),
+    ('/api/lists/popular?page=x', 400),
+    ('/api/search', 400),
+    ('/nope', 404),
+])
+def test_bad_requests(api, target, status):
+    assert get(api, target)[0] == status
+
+
+def test_only_get_is_allowed(api):
+    assert asyncio.run(api.dispatch('POST', '/api/genres'))[0] == 405
+
+
+def test_concurrent_misses_share_one_fetch(api):
+    calls = []
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def produce():
+            calls.append(1)
+            await release.wait()
+            return b'body', True
+        first = asyncio.create_task(api.cached('k', produce))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(api.cached('k', produce))
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(first, second)
+    assert asyncio.run(scenario()) == [b'body', b'body']
+    assert calls == [1]
+    assert api.coalesced == 1
+
+
+def test_waiters_are_released_when_the_owner_is_cancelled(api):
+    async def scenario():
+        async def produce():
+            await asyncio.sleep(10)
+        owner = asyncio.create_task(api.cached('k', produce))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(api.cached('k', produce))
+        await asyncio.sleep(0)
+        owner.cancel()
+        with pytest.raises(server.HTTPError) as err:
+            await asyncio.wait_for(waiter, 1)
+        return err.value.status
+    assert asyncio.run(scenario()) == 503
+
+
+async def exchange(api, request):
+    srv = await asyncio.start_server(api.handle, '127.0.0.1', 0, limit=server.MAX_HEADER_BYTES)
+    port = srv.sockets[0].getsockname()[1]
+    async with srv:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(request)
+        await writer.drain()
+        reply = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+        await writer.wait_closed()
+    return reply
+
+
+@pytest.mark.parametrize('length, status', [('abc', b'400'), ('-1', b'400'), (str(1 << 20), b'413')])
+def test_bad_content_length_is_rejected(api, length, status):
+    request = f'GET /healthz HTTP/1.1\r\nContent-Length: {length}\r\n\r\n'.encode()
+    reply = asyncio.run(exchange(api, request))
+    assert reply.split(b' ')[1] == status
+
+
+def test_keep_alive_serves_several_requests(api):
+    request = b'GET /healthz HTTP/1.1\r\n\r\n' + b'GET /healthz HTTP/1.1\r\nConnection: close\r\n\r\n'
+    reply = asyncio.run(exchange(api, request))
+    assert reply.count(b'HTTP/1.1 200 OK') == 2
+    assert reply.endswith(b'{"ok":true}')
@@ -0,0 +1,64 @@
+import struct
+
+import snapshot
+from movie_data import MovieDetails
+
+
+def movies():
+    return [
+        MovieDetails('Amélie', 'Une fille\nà Paris', '2001-04-25', '/a.jpg', 194, 7.9, [35, 10749]),
+        MovieDetails('Heat', '', '1995-12-15', '/h.jpg', 949, 7.7, []),
+        MovieDetails('No poster', 'x', '', '', 4_000_000_000, 0, [18]),
+    ]
+
+
+def same(a, b):
+    return all(getattr(a, f) == getattr(b, f) for f in MovieDetails.__slots__)
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'snap.bin')
+    snapshot.save(path, {'category': 'Top Rated', 'scroll': 812.5, 'first_page': 2, 'pages': 3}, movies())
+    state, out = snapshot.load(path)
+    assert state['category'] == 'Top Rated'
+    assert state['scroll'] == 812.5
+    assert (state['first_page'], state['pages'], state['count']) == (2, 3, 3)
+    assert len(out) == 3
+    assert all(same(a, b) for a, b in zip(movies(), out))
+
+
+def test_empty_round_trip():
+    state, out = snapshot.decode(snapshot.encode({'category': 'Popular'}, []))
+    assert out == []
+    assert state['count'] == 0
+
+
+def test_missing_file(tmp_path):
+    assert snapshot.load(str(tmp_path / 'absent.bin')) is None
+
+
+def test_corrupt_files_are_rejected(tmp_path):
+    good = snapshot.encode({'category': 'Popular'}, movies())
+    header_len = struct.unpack_from('<I', good, len(snapshot.MAGIC))[0]
+    body_at = len(snapshot.MAGIC) + 4 + header_len
+    cases = {
+        'magic': b'NOTASNAP' + good[8:],
+        'short': good[:10],
+        'header': good[:len(snapshot.MAGIC) + 4] + b'[' + good[len(snapshot.MAGIC) + 5:],
+        'body': good[:body_at] + b'\0' * 16,
+        'version': good.replace(b'"version": 1', b'"version": 9'),
+    }
+    for name, blob in cases.items():
+        path = tmp_path / f'{name}.bin'
+        path.write_bytes(blob)
+        assert snapshot.load(str(path)) is None, name
+
+
+def test_save_replaces_atomically(tmp_path):
+    path = str(tmp_path / 'snap.bin')
+    snapshot.save(path, {'category': 'Popular'}, movies())
+    snapshot.save(path, {'category': 'Now Playing'}, movies()[:1])
+    state, out = snapshot.load(path)
+    assert state['category'] == 'Now Playing'
+    assert len(out) == 1
+    assert not (tmp_path / 'snap.bin.tmp').exists()
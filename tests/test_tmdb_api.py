@@ -0,0 +1,156 @@
+import json
+import threading
+import time
+
+import pytest
+import requests
+
+import tmdb_api
+from tmdb_api import TMDBClient, TMDBError, TokenBucket
+from transport import make_response
+
+
+def reply(status=200, body=None, **headers):
+    return make_response(status, json.dumps(body or {}).encode(), headers)
+
+
+class ScriptedSession(requests.Session):
+    def __init__(self, *steps):
+        super().__init__()
+        self.steps = list(steps)
+        self.calls = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.calls.append((url, dict(params or {}), headers))
+        step = self.steps.pop(0)
+        if isinstance(step, Exception):
+            raise step
+        return step
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(tmdb_api, 'time', fake)
+    return fake
+
+
+def client(session, **kwargs):
+    kwargs.setdefault('rate', 0)
+    return TMDBClient('key', base='http://tmdb.test/3', session=session, **kwargs)
+
+
+def test_requests_carry_the_key_and_page():
+    session = ScriptedSession(reply(200, {'results': [1]}, ETag='"v1"'))
+    data, etag = client(session).movie_list('popular', 2)
+    assert (data, etag) == ({'results': [1]}, '"v1"')
+    url, params, _ = session.calls[0]
+    assert url == 'http://tmdb.test/3/movie/popular'
+    assert params['page'] == 2
+    assert params['api_key'] == 'key'
+
+
+def test_not_modified_returns_the_etag():
+    session = ScriptedSession(reply(304))
+    c = client(session)
+    assert c.movie_list('popular', etag='"v1"') == (None, '"v1"')
+    assert session.calls[0][2] == {'If-None-Match': '"v1"'}
+    assert c.stats()['not_modified'] == 1
+
+
+def test_errors_carry_the_tmdb_message():
+    session = ScriptedSession(reply(404, {'status_message': 'missing'}))
+    with pytest.raises(TMDBError) as err:
+        client(session).movie(5)
+    assert err.value.status == 404
+    assert 'missing' in str(err.value)
+
+
+def test_retries_server_errors_then_succeeds(clock):
+    session = ScriptedSession(reply(503), requests.ConnectionError('reset'), reply(200, {'results': [1]}))
+    c = client(session, retries=3)
+    data, _ = c.movie_list('popular', 2)
+    assert data == {'results': [1]}
+    assert len(session.calls) == 3
+    assert c.stats()['retried'] == 2
+    assert len(clock.sleeps) == 2
+
+
+def test_retry_after_sets_the_minimum_delay(clock):
+    session = ScriptedSession(reply(429, **{'Retry-After': '3'}), reply(200, {'ok': True}))
+    client(session).get('/genre/movie/list')
+    assert clock.sleeps[0] >= 3
+
+
+def test_gives_up_after_retries(clock):
+    session = ScriptedSession(*[reply(429, {'status_message': 'slow down'})] * 3)
+    with pytest.raises(TMDBError) as err:
+        client(session, retries=2).get('/movie/popular')
+    assert err.value.status == 429
+    assert 'slow down' in str(err.value)
+    assert len(session.calls) == 3
+
+
+def test_client_errors_are_not_retried(clock):
+    session = ScriptedSession(reply(404, {'status_message': 'missing'}))
+    with pytest.raises(TMDBError):
+        client(session, retries=3).movie(5)
+    assert len(session.calls) == 1
+    assert clock.sleeps == []
+
+
+def test_identical_concurrent_calls_share_one_request():
+    release = threading.Event()
+    entered = threading.Event()
+
+    class SlowSession(ScriptedSession):
+        def get(self, *args, **kwargs):
+            entered.set()
+            release.wait(5)
+            return super().get(*args, **kwargs)
+
+    session = SlowSession(reply(200, {'results': ['x']}))
+    c = client(session)
+    results = []
+    call = lambda: results.append(c.movie_list('popular', 1))
+    owner = threading.Thread(target=call)
+    waiter = threading.Thread(target=call)
+    try:
+        owner.start()
+        assert entered.wait(5)
+        waiter.start()
+        deadline = time.monotonic() + 5
+        while c.stats()['coalesced'] == 0:
+            assert time.monotonic() < deadline, "the second call never joined the first"
+            time.sleep(0.001)
+    finally:
+        release.set()
+        owner.join(5)
+        if waiter.ident is not None:
+            waiter.join(5)
+    assert len(session.calls) == 1
+    assert results[0] == results[1]
+
+
+def test_token_bucket_waits_once_the_burst_is_spent(clock):
+    # A rate of 4/s keeps every delay exact in binary, so the fake clock
+    # lands on whole tokens.
+    bucket = TokenBucket(rate=4, burst=2)
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0.25
+    clock.now += 1.0
+    assert bucket.acquire() == 0
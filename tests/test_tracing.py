@@ -0,0 +1,60 @@
+import asyncio
+import json
+import threading
+
+from tracing import Tracer
+
+
+def test_spans_feed_histograms_and_chrome_export(tmp_path):
+    tracer = Tracer()
+    with tracer.span('fetch', page=1) as span:
+        span.args['rows'] = 20
+    tracer.record('paint', 0, 2_000_000)
+    hist = tracer.histograms()
+    assert hist['fetch']['count'] == 1
+    assert hist['paint']['max_ms'] == 2.0
+    path = tracer.export_chrome(str(tmp_path / 'trace.json'))
+    with open(path) as f:
+        events = json.load(f)['traceEvents']
+    fetch = next(e for e in events if e['name'] == 'fetch')
+    assert fetch['args'] == {'page': 1, 'rows': 20}
+    assert any(e['ph'] == 'M' for e in events)
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer(enabled=False)
+    with tracer.span('fetch') as span:
+        span.args['rows'] = 20
+        span.args.update(page=1)
+    assert dict(span.args) == {}
+    tracer.record('paint', 0)
+    assert tracer.histograms() == {}
+
+
+def test_counts_are_exact_across_threads():
+    tracer = Tracer(capacity=10)
+
+    def work():
+        for _ in range(2000):
+            tracer.record('tick', 0, 1)
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert tracer.histograms()['tick']['count'] == 16000
+
+
+def test_aiter_spans_times_each_item():
+    tracer = Tracer()
+
+    async def source():
+        for i in range(3):
+            yield i
+
+    async def collect():
+        return [i async for i in tracer.aiter_spans(source(), 'page', cat='x')]
+    assert asyncio.run(collect()) == [0, 1, 2]
+    assert tracer.histograms()['page']['count'] == 3
+    tracer.clear()
+    assert tracer.histograms() == {}
@@ -0,0 +1,168 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+import requests
+from requests.adapters import HTTPAdapter
+
+API_BASE = 'https://api.themoviedb.org/3'
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = (3.05, 10)
+# TMDB allows roughly 50 requests per second per IP; stay a little under.
+DEFAULT_RATE = 40.0
+DEFAULT_BURST = 20
+DEFAULT_RETRIES = 3
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+
+
+class TMDBError(Exception):
+    def __init__(self, status, message):
+        super().__init__(f"TMDB error {status}: {message}")
+        self.status = status
+        self.message = message
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class TMDBClient:
+    def __init__(self, api_key, base=API_BASE, language='en-US', pool_size=DEFAULT_POOL_SIZE,
+                 timeout=DEFAULT_TIMEOUT, session=None, rate=DEFAULT_RATE, burst=DEFAULT_BURST,
+                 retries=DEFAULT_RETRIES):
+        self.api_key = api_key
+        self.base = base.rstrip('/')
+        self.language = language
+        self.timeout = timeout
+        self.retries = retries
+        self.bucket = TokenBucket(rate, burst) if rate > 0 else None
+        self.requests = 0
+        self.not_modified = 0
+        self.coalesced = 0
+        self.throttled = 0
+        self.retried = 0
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.session = session or requests.Session()
+        # One pool per host, kept alive across pages and searches so only the
+        # first request pays for the TCP and TLS handshake.
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+        })
+
+    def get(self, path, params=None, etag=None):
+        key = (path, tuple(sorted((params or {}).items())), etag)
+        with self._lock:
+            fut = self._inflight.get(key)
+            owner = fut is None
+            if owner:
+                fut = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not owner:
+            return fut.result()
+        try:
+            result = self._get(path, params, etag)
+            fut.set_result(result)
+            return result
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _send(self, path, query, headers):
+        attempt = 0
+        while True:
+            if self.bucket is not None and self.bucket.acquire():
+                with self._lock:
+                    self.throttled += 1
+            retry_after = None
+            try:
+                resp = self.session.get(self.base + path, params=query, headers=headers, timeout=self.timeout)
+                with self._lock:
+                    self.requests += 1
+                if resp.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    return resp
+                retry_after = resp.headers.get('Retry-After')
+                reason = resp.status_code
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.retries:
+                    raise
+                reason = type(e).__name__
+            # Full jitter keeps a fleet of clients from retrying in lockstep.
+            delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+            if retry_after:
+                try:
+                    delay = max(delay, float(retry_after))
+                except ValueError:
+                    pass
+            attempt += 1
+            with self._lock:
+                self.retried += 1
+            logging.warning(f"TMDB {path} failed ({reason}), retry {attempt}/{self.retries} in {delay:.2f}s")
+            time.sleep(delay)
+
+    def _get(self, path, params, etag):
+        query = {'api_key': self.api_key, 'language': self.language}
+        if params:
+            query.update(params)
+        headers = {'If-None-Match': etag} if etag else None
+        resp = self._send(path, query, headers)
+        if resp.status_code == 304:
+            with self._lock:
+                self.not_modified += 1
+            return None, etag
+        if resp.status_code >= 400:
+            try:
+                message = resp.json().get('status_message') or resp.reason
+            except ValueError:
+                message = resp.reason
+            raise TMDBError(resp.status_code, message)
+        return resp.json(), resp.headers.get('ETag')
+
+    def movie_list(self, endpoint, page=1, query=None, etag=None):
+        if endpoint == 'search':
+            return self.get('/search/movie', {'query': query, 'page': page}, etag)
+        return self.get(f'/movie/{endpoint}', {'page': page}, etag)
+
+    def movie(self, movie_id, etag=None):
+        return self.get(f'/movie/{int(movie_id)}', None, etag)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'requests': self.requests, 'not_modified': self.not_modified,
+                'coalesced': self.coalesced, 'throttled': self.throttled, 'retried': self.retried,
+            }
+
+    def close(self):
+        self.session.close()
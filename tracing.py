@@ -0,0 +1,169 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+DEFAULT_CAPACITY = 50000
+DEFAULT_WINDOW = 1024
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'args', 'start')
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.record(self.name, self.start, **self.args)
+        return False
+
+
+class _NullArgs(dict):
+    # Shared by every disabled span across threads, so writes are dropped.
+    def __setitem__(self, key, value):
+        pass
+
+    def update(self, *a, **kw):
+        pass
+
+    def setdefault(self, key, default=None):
+        return default
+
+
+class _NullSpan:
+    __slots__ = ('args',)
+
+    def __init__(self):
+        self.args = _NullArgs()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    def __init__(self, capacity=DEFAULT_CAPACITY, window=DEFAULT_WINDOW, enabled=True):
+        self.enabled = enabled
+        self.window = window
+        self.origin = time.perf_counter_ns()
+        # deque.append is atomic, so the event log needs no lock; the counts
+        # and windows are read-modify-write and share one.
+        self._events = deque(maxlen=capacity)
+        self._durations = {}
+        self._counts = {}
+        self._threads = {}
+        self._lock = threading.Lock()
+
+    def span(self, name, **args):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def record(self, name, start_ns, end_ns=None, **args):
+        if not self.enabled:
+            return
+        if end_ns is None:
+            end_ns = time.perf_counter_ns()
+        tid = threading.get_ident()
+        dur = end_ns - start_ns
+        self._events.append((name, start_ns, dur, tid, args or None))
+        with self._lock:
+            if tid not in self._threads:
+                self._threads[tid] = threading.current_thread().name
+            window = self._durations.get(name)
+            if window is None:
+                window = self._durations[name] = deque(maxlen=self.window)
+            window.append(dur)
+            self._counts[name] = self._counts.get(name, 0) + 1
+
+    async def aiter_spans(self, iterable, name, **args):
+        it = aiter(iterable)
+        index = 0
+        while True:
+            start = time.perf_counter_ns()
+            try:
+                item = await anext(it)
+            except StopAsyncIteration:
+                return
+            self.record(name, start, index=index, **args)
+            yield item
+            index += 1
+
+    def histograms(self):
+        with self._lock:
+            windows = {name: list(window) for name, window in self._durations.items()}
+            counts = dict(self._counts)
+        out = {}
+        for name, window in windows.items():
+            samples = sorted(window)
+            if not samples:
+                continue
+            n = len(samples)
+            pick = lambda q: samples[min(n - 1, int(q * n))] / 1e6
+            out[name] = {
+                'count': counts.get(name, n),
+                'window': n,
+                'mean_ms': sum(samples) / n / 1e6,
+                'p50_ms': pick(0.50),
+                'p95_ms': pick(0.95),
+                'p99_ms': pick(0.99),
+                'max_ms': samples[-1] / 1e6,
+            }
+        return out
+
+    def summary(self):
+        lines = [f"{'span':28} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"]
+        for name, h in sorted(self.histograms().items()):
+            lines.append(f"{name:28} {h['count']:7d} {h['p50_ms']:9.2f} {h['p95_ms']:9.2f} "
+                         f"{h['p99_ms']:9.2f} {h['max_ms']:9.2f}")
+        return '\n'.join(lines)
+
+    def chrome_events(self):
+        pid = os.getpid()
+        with self._lock:
+            threads = list(self._threads.items())
+        events = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': tname}}
+            for tid, tname in threads
+        ]
+        for name, start, dur, tid, args in list(self._events):
+            ev = {
+                'name': name, 'cat': name.split('.', 1)[0], 'ph': 'X', 'pid': pid, 'tid': tid,
+                'ts': (start - self.origin) / 1000.0, 'dur': dur / 1000.0,
+            }
+            if args:
+                ev['args'] = {k: v if isinstance(v, (int, float, str, bool)) or v is None else str(v)
+                              for k, v in args.items()}
+            events.append(ev)
+        return events
+
+    def export_chrome(self, path):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'traceEvents': self.chrome_events(), 'displayTimeUnit': 'ms'}, f)
+        os.replace(tmp, path)
+        return path
+
+    def clear(self):
+        self._events.clear()
+        with self._lock:
+            self._durations.clear()
+            self._counts.clear()
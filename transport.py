@@ -0,0 +1,171 @@
+import atexit
+import base64
+import gzip
+import json
+import logging
+import os
+import random
+import threading
+import time
+import zlib
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control', 'X-RateLimit-Remaining', 'X-RateLimit-Reset')
+TEXT_TYPES = ('application/json', 'text/')
+
+
+def request_key(method, url):
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != 'api_key')
+    return f'{method.upper()} {parts.path}?{urlencode(query)}'
+
+
+def full_url(method, url, params=None):
+    if not params:
+        return url
+    return requests.Request(method, url, params=params).prepare().url
+
+
+def make_response(status, body, headers=None, url='', reason=''):
+    resp = requests.Response()
+    resp.status_code = status
+    resp._content = body
+    resp.headers = CaseInsensitiveDict(headers or {})
+    resp.url = url
+    resp.reason = reason
+    resp.encoding = 'utf-8'
+    return resp
+
+
+class RecordingSession(requests.Session):
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self.recorded = 0
+        self._lock = threading.Lock()
+        self._writer = None
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+    def request(self, method, url, *args, **kwargs):
+        resp = super().request(method, url, *args, **kwargs)
+        ctype = resp.headers.get('Content-Type', '')
+        entry = {
+            'key': request_key(method, full_url(method, url, kwargs.get('params'))),
+            'status': resp.status_code,
+            'reason': resp.reason,
+            'headers': {h: resp.headers[h] for h in KEPT_HEADERS if h in resp.headers},
+        }
+        if ctype.startswith(TEXT_TYPES):
+            entry['text'] = resp.content.decode('utf-8', 'replace')
+        else:
+            entry['b64'] = base64.b64encode(resp.content).decode('ascii')
+        line = (json.dumps(entry, separators=(',', ':')) + '\n').encode('utf-8')
+        with self._lock:
+            # One gzip member per session keeps a shared dictionary; the sync
+            # flush gets each response to disk without resetting it.
+            if self._writer is None:
+                self._writer = gzip.open(self.path, 'ab')
+            self._writer.write(line)
+            self._writer.flush(zlib.Z_SYNC_FLUSH)
+            self.recorded += 1
+        return resp
+
+    def close(self):
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        super().close()
+
+
+class ReplaySession(requests.Session):
+    def __init__(self, path, latency_ms=0, jitter_ms=0, error_rate=0.0, error_status=429, seed=None):
+        super().__init__()
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.served = 0
+        self.missing = 0
+        self.injected = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._cursor = {}
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries.setdefault(entry['key'], []).append(entry)
+        except EOFError:
+            # A recorder that was killed never wrote the gzip trailer; every
+            # flushed response before that point is still usable.
+            logging.warning(f"Replay archive {path} is truncated; using {len(self)} responses")
+
+    def __len__(self):
+        return sum(len(v) for v in self._entries.values())
+
+    def request(self, method, url, *args, **kwargs):
+        key = request_key(method, full_url(method, url, kwargs.get('params')))
+        with self._lock:
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            inject = self._rng.random() < self.error_rate
+            entries = self._entries.get(key)
+            entry = None
+            if inject:
+                self.injected += 1
+            elif entries:
+                i = self._cursor.get(key, 0)
+                entry = entries[i % len(entries)]
+                self._cursor[key] = i + 1
+                self.served += 1
+            else:
+                self.missing += 1
+        if delay:
+            time.sleep(delay)
+
+        if inject:
+            body = json.dumps({'success': False, 'status_code': 25,
+                               'status_message': 'Injected replay error.'}).encode()
+            return make_response(self.error_status, body, {
+                'Content-Type': 'application/json', 'Retry-After': '1',
+                'X-RateLimit-Remaining': '0' if self.error_status == 429 else '40',
+                'X-RateLimit-Reset': str(int(time.time()) + 1),
+            }, url, 'Injected')
+        if entry is None:
+            logging.warning(f"Replay has no recording for {key}")
+            body = json.dumps({'success': False, 'status_code': 34,
+                               'status_message': 'Not in replay archive.'}).encode()
+            return make_response(404, body, {'Content-Type': 'application/json'}, url, 'Not Found')
+
+        body = entry['text'].encode('utf-8') if 'text' in entry else base64.b64decode(entry['b64'])
+        return make_response(entry['status'], body, entry['headers'], url, entry.get('reason', ''))
+
+
+def session_from_env(default_path='tmdb_traffic.jsonl.gz'):
+    mode = (os.getenv('TMDB_TRANSPORT') or '').lower()
+    if not mode or mode == 'live':
+        return None
+    path = os.getenv('TMDB_TRAFFIC_FILE') or default_path
+    if mode == 'record':
+        logging.info(f"Recording TMDB traffic to {path}")
+        session = RecordingSession(path)
+        atexit.register(session.close)
+        return session
+    if mode == 'replay':
+        session = ReplaySession(
+            path,
+            latency_ms=float(os.getenv('TMDB_REPLAY_LATENCY_MS', 0)),
+            jitter_ms=float(os.getenv('TMDB_REPLAY_JITTER_MS', 0)),
+            error_rate=float(os.getenv('TMDB_REPLAY_ERROR_RATE', 0)),
+            error_status=int(os.getenv('TMDB_REPLAY_ERROR_STATUS', 429)),
+        )
+        logging.info(f"Replaying {len(session)} recorded TMDB responses from {path}")
+        return session
+    raise ValueError(f"Unknown TMDB_TRANSPORT {mode!r} (expected live, record or replay)")